@@ -1,10 +1,16 @@
-import streamlit as st
-import base64
-import time
 import os
+import streamlit as st
 from pathlib import Path
 import plotly.express as px
 import pandas as pd
+import aset
+import ringkasan
+import timing
+import impor
+
+# Frame bersama (data.get_dataset) dipakai semua sesi; dengan copy-on-write, turunan (filter, kolom baru)
+# tidak pernah mengubah frame asli di cache. Diaktifkan di setiap skrip halaman, bukan saat data diimpor
+pd.set_option("mode.copy_on_write", True)
 
 # ========== Konfigurasi Halaman ==========
 st.set_page_config(
@@ -12,24 +18,24 @@ st.set_page_config(
     layout="wide"
 )
 
-# ========== Fungsi Load Gambar Base64 ==========
-def get_base64(file_path):
-    with open(file_path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
+timing.start("main")
+
+# ========== Pemanasan Model ==========
+# Opsional (KLAIM_WARM_UP=1): model dimuat di thread latar. Secara default halaman utama tidak
+# mengimpor models/sklearn sama sekali; model baru dimuat saat halaman Prediksi dibuka
+if os.environ.get("KLAIM_WARM_UP", "0") == "1":
+    impor.lazy("models").warm_up_background()
 
 # ========== Load Background Jika Ada ==========
-bg_path = "assets/Latar-belakang.png"
-bg_image = get_base64(bg_path) if os.path.exists(bg_path) else ""
+# Gambar dikonversi ke WebP sekali dan disajikan dari static/, CSS hanya berisi URL-nya
+bg_path = aset.ASSET_DIR / "Latar-belakang.png"
+hero_bg = aset.background_css(".hero", bg_path.name) if bg_path.exists() else ""
 
 # ========== Load Font Google Poppins ==========
 st.markdown("""  
     <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@400;600&display=swap" rel="stylesheet">  
 """, unsafe_allow_html=True)
 
-# ========== Loading Spinner ==========
-with st.spinner("Memuat dashboard..."):
-    time.sleep(1.5)
-    
 # ========== Sidebar ==========
 with st.sidebar:
     st.sidebar.markdown("## 🏥 Info Dashboard")
@@ -132,9 +138,9 @@ st.markdown(f"""
             display: none !important;
         }}
 
+        {hero_bg}
         .hero {{
             height: 350px;
-            background-image: url("data:image/png;base64,{bg_image}");
             background-size: cover;
             background-position: center;
             border-radius: 15px;
@@ -367,17 +373,19 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-ina_cbgs = pd.read_excel('pengajuan_bpjs_10000.xlsx')
-non_cbgs = pd.read_excel('pengajuan_noncbgs_dengan_status.xlsx')
-obat = pd.read_excel('pengajuan_obat_dengan_status.xlsx')
+# Pie dibangun dari ringkasan per bulan/status (ringkasan.py), bukan dari dataset lengkap
+with st.spinner("Memuat dashboard..."), timing.stage("ringkasan"):
+    ina_cbgs = ringkasan.get("ina_cbgs")
+    non_cbgs = ringkasan.get("non_cbgs")
+    obat = ringkasan.get("obat")
 
 def prepare_verifikasi_data(df, jenis):
     return pd.DataFrame({
         "Jenis Klaim": [jenis] * 2,
         "Status": ["Disetujui", "Ditolak"],
         "Jumlah": [
-            df[df['status'] == 1].shape[0],
-            df[df['status'] == 0].shape[0]
+            int(df.loc[df['status'] == 1, 'jumlah'].sum()),
+            int(df.loc[df['status'] == 0, 'jumlah'].sum())
         ]
     })
 
@@ -436,6 +444,8 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+timing.panel()
+
 # ========== Copyright ==========
 st.markdown("""  
     <div style='text-align: center; padding: 20px 0 10px 0; font-size: 14px; color: #555;'>  
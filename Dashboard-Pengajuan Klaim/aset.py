@@ -0,0 +1,91 @@
+import hashlib
+import os
+from pathlib import Path
+
+import streamlit as st
+from PIL import Image
+
+BASE_DIR = Path(__file__).resolve().parent
+ASSET_DIR = BASE_DIR / "assets"
+# Disajikan Streamlit di /app/static/ (server.enableStaticServing di .streamlit/config.toml)
+STATIC_DIR = BASE_DIR / "static"
+STATIC_URL = "app/static"
+
+# ========== Ukuran Gambar Latar ==========
+# Lebar WebP yang dibuat per gambar; layar kecil memakai versi pertama
+LEBAR = (768, 1536)
+KUALITAS = 80
+LATAR = ("Latar-belakang.png", "background.png")
+
+
+def _fingerprint(src):
+    stat = src.stat()
+    kunci = f"{src.name}:{stat.st_mtime_ns}:{stat.st_size}:{LEBAR}:{KUALITAS}"
+    return hashlib.sha256(kunci.encode()).hexdigest()[:12]
+
+
+def build(nama_file):
+    # Encode sekali per versi file sumber; hasil yang sudah ada di static/ dipakai ulang
+    src = ASSET_DIR / nama_file
+    versi = _fingerprint(src)
+    STATIC_DIR.mkdir(exist_ok=True)
+
+    urls = {}
+    with Image.open(src) as img:
+        for lebar in LEBAR:
+            out = STATIC_DIR / f"{src.stem}-{lebar}-{versi}.webp"
+            if not out.exists():
+                lebar_akhir = min(lebar, img.width)
+                tinggi = round(img.height * lebar_akhir / img.width)
+                tmp = out.with_suffix(f".webp.{os.getpid()}.tmp")
+                img.resize((lebar_akhir, tinggi), Image.LANCZOS).save(tmp, "WEBP", quality=KUALITAS, method=6)
+                os.replace(tmp, out)
+            # ?v= membuat Tornado mengirim Cache-Control jangka panjang; nama file berubah jika sumber berubah
+            urls[lebar] = f"{STATIC_URL}/{out.name}?v={versi}"
+
+    # Hapus varian lama dari versi sumber sebelumnya
+    for lama in STATIC_DIR.glob(f"{src.stem}-*.webp"):
+        if not lama.name.endswith(f"-{versi}.webp"):
+            lama.unlink(missing_ok=True)
+    return urls
+
+
+@st.cache_resource(show_spinner=False)
+def _urls(nama_file, versi):
+    return build(nama_file)
+
+
+def urls(nama_file):
+    return _urls(nama_file, _fingerprint(ASSET_DIR / nama_file))
+
+
+def background_css(selector, nama_file):
+    # Hanya URL yang dikirim ke browser, bukan isi gambar
+    ukuran = urls(nama_file)
+    kecil, besar = ukuran[LEBAR[0]], ukuran[LEBAR[-1]]
+    return (
+        f'{selector} {{ background-image: url("{kecil}"); }}\n'
+        f'@media (min-width: {LEBAR[0] + 1}px) {{ {selector} {{ background-image: url("{besar}"); }} }}\n'
+    )
+
+
+def add_bg(nama_file, selector=".stApp"):
+    st.markdown(
+        f"""
+        <style>
+        {background_css(selector, nama_file)}
+        {selector} {{
+            background-size: cover;
+            background-attachment: fixed;
+            background-position: center;
+        }}
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
+
+
+if __name__ == "__main__":
+    for nama_file in LATAR:
+        for lebar, url in build(nama_file).items():
+            print(f"{nama_file} {lebar}px: {url}")
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import fitur
+import models
+
+CHUNK_SIZE = 10_000
+
+
+def read_upload(file):
+    nama_file = file.name.lower()
+    if nama_file.endswith(".csv"):
+        return pd.read_csv(file)
+    if nama_file.endswith(".parquet"):
+        return pd.read_parquet(file)
+    return pd.read_excel(file)
+
+
+def kolom_kosong(nama, df, X):
+    # Kolom wajib yang kosong per baris; nilai mentah ikut dicek karena sebagian fitur diubah ke teks ("nan")
+    mentah = fitur._check_columns(nama, df)[fitur.KOLOM_INPUT[nama]].isna()
+    turunan = X.isna()
+    kosong = pd.concat([mentah, turunan[turunan.columns.difference(mentah.columns, sort=False)]], axis=1)
+    return kosong.dot(kosong.columns + ", ").str.rstrip(", ")
+
+
+def score_frame(nama, df, progress=None):
+    # Baris dengan fitur wajib kosong tidak diprediksi (skor/label NaN) dan diberi alasan,
+    # supaya satu baris tidak lengkap tidak menggagalkan seluruh file
+    X = fitur.FITUR[nama](df)
+    kosong = kolom_kosong(nama, df, X)
+    lengkap = (kosong == "").to_numpy()
+    X = X[lengkap]
+
+    scores = np.full(len(df), np.nan)
+    posisi = np.flatnonzero(lengkap)
+    for mulai in range(0, len(X), CHUNK_SIZE):
+        selesai = min(mulai + CHUNK_SIZE, len(X))
+        scores[posisi[mulai:selesai]] = models.predict_scores(nama, X.iloc[mulai:selesai])
+        if progress is not None:
+            progress(selesai / len(X))
+
+    hasil = df.copy()
+    hasil["prediction_score"] = scores
+    hasil["prediction_label"] = np.where(lengkap, scores >= models.THRESHOLD, np.nan)
+    hasil["prediction_skip_reason"] = np.where(lengkap, None, "kolom kosong: " + kosong)
+    return hasil
+
+
+def prediksi_batch(nama, judul):
+    st.markdown(f'<h2 class="title">PREDIKSI BATCH PENGKLAIMAN {judul}</h2>', unsafe_allow_html=True)
+    st.sidebar.title('Cara Penggunaan')
+    st.sidebar.markdown(f"""
+        - Unggah file ekspor klaim (CSV, XLSX atau Parquet).
+        - Kolom wajib: {', '.join(fitur.KOLOM_INPUT[nama])}.
+        - Unduh hasil prediksi setelah proses selesai.
+    """)
+    st.sidebar.markdown("---")
+
+    file = st.file_uploader("Unggah File Klaim", type=["csv", "xlsx", "parquet"])
+    if file is None:
+        return
+
+    # Hasil disimpan per sesi agar klik tombol unduh tidak memicu prediksi ulang
+    key = f"batch_{nama}_{file.name}_{file.size}"
+    if key not in st.session_state:
+        for lama in [k for k in st.session_state if k.startswith(f"batch_{nama}_")]:
+            del st.session_state[lama]
+        try:
+            with st.spinner("Membaca file..."):
+                df = read_upload(file)
+            bar = st.progress(0.0)
+            hasil = score_frame(nama, df, progress=bar.progress)
+            bar.empty()
+        except Exception as e:
+            st.error(f"Terjadi kesalahan saat memproses file: {str(e)}")
+            return
+        st.session_state[key] = {"hasil": hasil, "csv": hasil.to_csv(index=False).encode("utf-8")}
+
+    hasil = st.session_state[key]["hasil"]
+    disetujui = int((hasil["prediction_label"] == 1).sum())
+    ditolak = int((hasil["prediction_label"] == 0).sum())
+    dilewati = len(hasil) - disetujui - ditolak
+
+    st.markdown("<h3>🧠 Hasil Prediksi</h3>", unsafe_allow_html=True)
+    st.markdown(f"<p style='font-size:20px'><b>Jumlah Klaim:</b> {len(hasil):,}</p>", unsafe_allow_html=True)
+    st.markdown(f"<p style='font-size:20px'><b>Berpotensi Disetujui:</b> {disetujui:,}</p>", unsafe_allow_html=True)
+    st.markdown(f"<p style='font-size:20px'><b>Berpotensi Ditolak:</b> {ditolak:,}</p>", unsafe_allow_html=True)
+    if dilewati:
+        st.warning(f"{dilewati:,} baris tidak diprediksi karena kolom wajib kosong (lihat kolom prediction_skip_reason)")
+    st.dataframe(hasil.head(200), use_container_width=True)
+
+    st.download_button(
+        "Unduh Hasil Prediksi",
+        data=st.session_state[key]["csv"],
+        file_name=f"prediksi_{nama}.csv",
+        mime="text/csv"
+    )
@@ -0,0 +1,170 @@
+import argparse
+import json
+import platform
+import resource
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import cube
+import data
+import fitur
+import kpi
+import models
+import query
+import sintetis
+import stream
+
+# ========== Benchmark ==========
+# Mengukur tahap yang dijalankan halaman dashboard pada data sintetis berbagai ukuran.
+# Hasil ditulis ke JSON supaya bisa dibandingkan antar commit/mesin.
+UKURAN = [10_000, 100_000, 1_000_000]
+
+# Agregasi grafik per halaman: (kolom grup, {kolom hasil: (kolom, fungsi)}), sama dengan builder di pages/
+GRAFIK = {
+    "ina_cbgs": {
+        "tarif_per_kelas": (["KELAS_RAWAT_LABEL"], {"TARIF_RS": ("TARIF_RS", "sum"), "TOTAL_TARIF": ("TOTAL_TARIF", "sum")}),
+        "selisih_per_diagnosa": (["DESKRIPSI_INACBG"], {
+            "RATA_TARIF_RS": ("TARIF_RS", "mean"), "RATA_TOTAL_TARIF": ("TOTAL_TARIF", "mean"),
+            "RATA_SELISIH": ("SELISIH", "mean"), "FREKUENSI": ("DESKRIPSI_INACBG", "count"),
+        }),
+    },
+    "non_cbgs": {
+        "jenis_pelayanan": (["jnspelayanan"], {"size": ("jnspelayanan", "size")}),
+        "treemap_diagnosa": (["diagnosa"], {"tarifrs": ("tarifrs", "sum")}),
+    },
+    "obat": {
+        "biaya_per_obat": (["obat"], {"BIAYA_TAGIHAN": ("BIAYA_TAGIHAN", "sum"), "biayasetuju": ("biayasetuju", "sum")}),
+    },
+}
+# Grafik tren memakai cube bulanan; INA-CBGs juga per kelas rawat
+CUBE = {"ina_cbgs": [None, "KELAS_RAWAT"], "non_cbgs": [None], "obat": [None]}
+
+
+def _ukur(fungsi, ulang):
+    waktu, hasil = [], None
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        hasil = fungsi()
+        waktu.append(time.perf_counter() - mulai)
+    return hasil, {"min_s": min(waktu), "median_s": statistics.median(waktu)}
+
+
+def _figure_cube(df_cube, values):
+    return px.line(df_cube, x="TAHUN_BULAN", y=values).to_json()
+
+
+def _figure_agg(df_agg, by, aggs):
+    return px.bar(df_agg, x=by[0], y=list(aggs)[0]).to_json()
+
+
+def _load(nama, store):
+    df = data._prepare(nama, pq.read_table(store, memory_map=True).to_pandas())
+    return df, data._build_partitions(df)
+
+
+def run_dataset(nama, rows, folder, ulang, seed):
+    hasil = []
+
+    def catat(tahap, ukuran, **lain):
+        hasil.append({"dataset": nama, "rows": rows, "stage": tahap, **ukuran, **lain})
+
+    mulai = time.perf_counter()
+    mentah = folder / f"{nama}-{rows}.parquet"
+    sintetis.write(nama, rows, mentah, seed=seed)
+    durasi = time.perf_counter() - mulai
+    catat("generate", {"min_s": durasi, "median_s": durasi})
+
+    store = folder / f"{nama}-{rows}.store.parquet"
+    _, ukuran = _ukur(lambda: stream.write(nama, mentah, store), ulang)
+    catat("convert", ukuran, bytes=store.stat().st_size)
+
+    (df, partitions), ukuran = _ukur(lambda: _load(nama, store), ulang)
+    catat("load", ukuran, memory_bytes=int(df.memory_usage(deep=True).sum()))
+
+    tahun = sorted({t for t, _ in partitions})
+    semua = list(data.bulan_mapping)
+    df_filtered, ukuran = _ukur(lambda: data.slice_periode(df, partitions, tahun, semua), ulang)
+    catat("filter_df", ukuran, rows_out=len(df_filtered))
+    sempit, ukuran = _ukur(lambda: data.slice_periode(df, partitions, tahun[-1:], [1, 2, 3]), ulang)
+    catat("filter_df:1_tahun_3_bulan", ukuran, rows_out=len(sempit))
+
+    _, ukuran = _ukur(lambda: kpi.compute(nama, df_filtered), ulang)
+    catat("kpi", ukuran)
+
+    values = cube.CUBES[nama]["values"]
+    for dim in CUBE[nama]:
+        df_cube, ukuran = _ukur(lambda: cube.build_cube(df, dim, values), ulang)
+        catat(f"cube:{dim or 'bulan'}", ukuran, rows_out=len(df_cube))
+        _, ukuran = _ukur(lambda: _figure_cube(df_cube, values), ulang)
+        catat(f"chart:tren_{dim or 'bulan'}", ukuran)
+
+    for chart_id, (by, aggs) in GRAFIK[nama].items():
+        df_agg, ukuran = _ukur(lambda: query.aggregate(nama, df_filtered, None, by, **aggs), ulang)
+        catat(f"chart:{chart_id}:agregasi", ukuran, rows_out=len(df_agg))
+        _, ukuran = _ukur(lambda: _figure_agg(df_agg, by, aggs), ulang)
+        catat(f"chart:{chart_id}:figure", ukuran)
+
+    # predict_status di halaman: satu baris input form (selalu terisi lengkap) -> fitur -> skor model
+    try:
+        models.get_model(nama)
+        contoh = next(pq.ParquetFile(mentah).iter_batches(batch_size=1000)).to_pandas()
+        X = fitur.FITUR[nama](contoh).dropna().head(1)
+        _, ukuran = _ukur(lambda: models.predict_scores(nama, X), max(ulang, 10))
+        catat("predict_status", ukuran)
+    except Exception as e:
+        catat("predict_status", {"min_s": None, "median_s": None}, error=f"{type(e).__name__}: {e}")
+
+    return hasil
+
+
+def run(datasets, sizes, ulang=3, seed=0):
+    if query.uses_sql():
+        raise SystemExit("Benchmark mengukur jalur pandas; jalankan tanpa KLAIM_BACKEND atau dengan KLAIM_BACKEND=pandas")
+
+    hasil = []
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        for rows in sizes:
+            for nama in datasets:
+                print(f"{nama} {rows:,} baris...", flush=True)
+                hasil.extend(run_dataset(nama, rows, Path(tmp), ulang, seed))
+                for path in Path(tmp).glob("*.parquet"):
+                    path.unlink()
+
+    return {
+        "dibuat": datetime.now().isoformat(timespec="seconds"),
+        "mesin": {"python": platform.python_version(), "platform": platform.platform(), "cpu": platform.processor()},
+        "versi": {"pandas": pd.__version__, "numpy": np.__version__, "pyarrow": pa.__version__},
+        "seed": seed,
+        "ulang": ulang,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "hasil": hasil,
+    }
+
+
+if __name__ == "__main__":
+    # Sama dengan halaman dashboard (lihat Main.py)
+    pd.set_option("mode.copy_on_write", True)
+
+    parser = argparse.ArgumentParser(description="Benchmark dashboard dengan data klaim sintetis")
+    parser.add_argument("--sizes", type=int, nargs="+", default=UKURAN, help="Jumlah baris, mis. 10000 100000 10000000")
+    parser.add_argument("--datasets", nargs="+", choices=list(data.DATASETS), default=list(data.DATASETS))
+    parser.add_argument("--ulang", type=int, default=3, help="Pengulangan per tahap (dilaporkan min dan median)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=Path("benchmark.json"))
+    args = parser.parse_args()
+
+    laporan = run(args.datasets, args.sizes, ulang=args.ulang, seed=args.seed)
+    args.out.write_text(json.dumps(laporan, indent=2))
+
+    tabel = pd.DataFrame(laporan["hasil"]).pivot_table(index=["dataset", "stage"], columns="rows", values="median_s")
+    print(tabel.round(4).to_string())
+    print(f"Laporan: {args.out}")
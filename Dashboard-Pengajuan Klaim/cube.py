@@ -0,0 +1,82 @@
+import threading
+
+import pandas as pd
+
+import data
+import query as backend
+
+# ========== Definisi Cube ==========
+# Agregat bulanan (TAHUN x BULAN x dimensi) yang dibangun sekali per versi dataset
+CUBES = {
+    "ina_cbgs": {"values": ["TARIF_RS", "TOTAL_TARIF"]},
+    "non_cbgs": {"values": ["tarifrs", "tagihan"]},
+    "obat": {"values": ["BIAYA_TAGIHAN", "biayasetuju"]},
+}
+
+_cubes = {}
+_cubes_lock = threading.Lock()
+
+
+def _keys(dim):
+    return ["TAHUN", "BULAN"] + ([dim] if dim else [])
+
+
+def build_cube(df, dim, values):
+    grouped = df.groupby(_keys(dim), observed=True)
+    hasil = grouped[values].sum()
+    hasil["JUMLAH"] = grouped.size()
+    return _finish(hasil.reset_index())
+
+
+def build_cube_sql(nama, dim, values):
+    # GROUP BY dijalankan di basis data; hanya satu baris per bulan (x dimensi) yang dibaca
+    aggs = {col: (col, "sum") for col in values}
+    aggs["JUMLAH"] = ("TAHUN", "size")
+    hasil = backend.aggregate(nama, None, None, _keys(dim), **aggs)
+    return _finish(hasil.astype({"TAHUN": int, "BULAN": int}))
+
+
+def merge_cube(df_cube, delta, dim, values):
+    # Tambahkan agregat baris baru (hasil ingest); hanya bulan yang ada di delta yang berubah nilainya
+    hasil = (pd.concat([df_cube, build_cube(delta, dim, values)], ignore_index=True)
+             .groupby(_keys(dim), observed=True, as_index=False)[values + ["JUMLAH"]]
+             .sum())
+    return _finish(hasil)
+
+
+def _finish(hasil):
+    # Kunci periode untuk sumbu-x grafik tren, dihitung sekali saat cube dibangun
+    hasil["BULAN_NAMA"] = hasil["BULAN"].map(data.bulan_mapping)
+    hasil["PERIODE"] = hasil["TAHUN"] * 100 + hasil["BULAN"]
+    hasil["TAHUN_BULAN"] = hasil["TAHUN"].astype(str) + " " + hasil["BULAN_NAMA"]
+    return hasil.sort_values("PERIODE", kind="stable", ignore_index=True)
+
+
+def get_cube(nama, dim=None):
+    versi = data.dataset_version(nama)
+    key = (nama, dim)
+    with _cubes_lock:
+        cached = _cubes.get(key)
+        if cached is None or cached[0] != versi:
+            values = CUBES[nama]["values"]
+            if backend.uses_sql():
+                df_cube = build_cube_sql(nama, dim, values)
+            else:
+                delta = data.get_delta(nama, cached[0]) if cached is not None else None
+                if delta is not None:
+                    df_cube = merge_cube(cached[1], delta, dim, values)
+                else:
+                    df_cube = build_cube(data.get_dataset(nama), dim, values)
+            cached = (versi, df_cube)
+            _cubes[key] = cached
+    return cached[1]
+
+
+def query(nama, dim=None, years=None, months=None):
+    # Cube hanya berisi satu baris per bulan (x dimensi), jadi filter di sini murah
+    df_cube = get_cube(nama, dim)
+    if years is not None:
+        df_cube = df_cube[df_cube["TAHUN"].isin(years)]
+    if months is not None:
+        df_cube = df_cube[df_cube["BULAN"].isin(months)]
+    return df_cube
@@ -0,0 +1,337 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+
+BASE_DIR = Path(__file__).resolve().parent
+CACHE_DIR = BASE_DIR / ".cache"
+# Ekspor bulanan yang di-ingest (lihat ingest.py), satu file Parquet per ingest
+PARTISI_DIR = BASE_DIR / "partisi"
+
+# ========== Sumber Data ==========
+DATASETS = {
+    "ina_cbgs": {
+        "file": "pengajuan_bpjs_10000.xlsx", "tanggal": "ADMISSION_DATE", "teks": ["PROCLIST"],
+        "label": ["KELAS_RAWAT"], "selisih": {"SELISIH": ("TARIF_RS", "TOTAL_TARIF")},
+    },
+    "non_cbgs": {"file": "pengajuan_noncbgs_dengan_status.xlsx", "tanggal": "tglmasuk", "teks": [], "label": [], "selisih": {}},
+    "obat": {"file": "pengajuan_obat_dengan_status.xlsx", "tanggal": "TGL_RESEP", "teks": [], "label": [], "selisih": {}},
+}
+FORMAT_TANGGAL = "%d/%m/%Y"
+
+# Kolom kunci baris klaim untuk de-duplikasi saat ingest. Non-CBGs dan Obat punya beberapa baris
+# per SEP/kunjungan (satu per item/obat), jadi kuncinya gabungan kolom yang membedakan baris
+KUNCI = {
+    "ina_cbgs": ["SEP"],
+    "non_cbgs": ["nosep", "no_mr", "nokartu", "nama", "jnspelayanan", "jenis_klaim", "tglmasuk", "diagnosa",
+                 "dpjp", "jumlah", "tarifrs", "tagihan", "jenistagihan"],
+    "obat": ["SEP_KUNJUNGAN", "noresep", "obat", "TGL_RESEP"],
+}
+
+# ========== Skema Memori ==========
+# "kategori": teks berulang disimpan sebagai category, "bilangan": hitungan kecil di-downcast,
+# "rupiah": nominal disimpan sebagai int64 (tetap float jika ada nilai kosong/pecahan).
+# Diterapkan saat ekspor ditulis ke Parquet (stream.write)
+SCHEMA_VERSION = 2
+SCHEMA = {
+    "ina_cbgs": {
+        "kategori": ["KELAS_RAWAT", "DESKRIPSI_INACBG", "DIAGLIST", "PROCLIST"],
+        "bilangan": ["UMUR_TAHUN", "LOS", "status"],
+        "rupiah": ["TARIF_RS", "TOTAL_TARIF"],
+    },
+    "non_cbgs": {
+        "kategori": ["jnspelayanan", "jenis_klaim", "diagnosa", "dpjp", "nama_file"],
+        "bilangan": ["jumlah", "status"],
+        "rupiah": ["tarifrs", "tagihan"],
+    },
+    "obat": {
+        "kategori": ["jenisresep", "obat", "ket_verfikasi", "no_fpk", "nama_file"],
+        "bilangan": ["jmlobat", "jmlobatsetuju", "status"],
+        "rupiah": ["BIAYA_TAGIHAN", "biayasetuju"],
+    },
+}
+# Kolom dengan nilai unik lebih dari rasio ini tidak hemat sebagai category
+RASIO_KATEGORI = 0.5
+
+bulan_mapping = {
+    1: "Januari", 2: "Februari", 3: "Maret", 4: "April", 5: "Mei", 6: "Juni",
+    7: "Juli", 8: "Agustus", 9: "September", 10: "Oktober", 11: "November", 12: "Desember"
+}
+
+_locks = {nama: threading.Lock() for nama in DATASETS}
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+
+def source_path(nama):
+    return BASE_DIR / DATASETS[nama]["file"]
+
+
+def parquet_path(nama):
+    return CACHE_DIR / f"{nama}.parquet"
+
+
+def _meta_path(nama):
+    return CACHE_DIR / f"{nama}.json"
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for blok in iter(lambda: f.read(1 << 20), b""):
+            h.update(blok)
+    return h.hexdigest()
+
+
+def _read_meta(nama):
+    with open(_meta_path(nama)) as f:
+        return json.load(f)
+
+
+def _write_meta(nama, meta):
+    tmp = _meta_path(nama).with_suffix(f".json.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, _meta_path(nama))
+
+
+def _is_fresh(nama):
+    src = source_path(nama)
+    if not parquet_path(nama).exists() or not _meta_path(nama).exists():
+        return False
+
+    meta = _read_meta(nama)
+    if meta.get("schema") != SCHEMA_VERSION:
+        return False
+    stat = src.stat()
+    if stat.st_mtime_ns == meta.get("mtime_ns") and stat.st_size == meta.get("size"):
+        return True
+
+    # mtime berubah (mis. file disalin ulang), cek apakah isinya benar-benar berubah
+    if stat.st_size == meta.get("size") and _sha256(src) == meta.get("sha256"):
+        meta["mtime_ns"] = stat.st_mtime_ns
+        _write_meta(nama, meta)
+        return True
+    return False
+
+
+def _normalize_columns(df):
+    # Kolom object campuran (angka + teks) tidak bisa disimpan ke Parquet, jadikan teks
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        jenis = pd.api.types.infer_dtype(df[col], skipna=True)
+        if jenis not in ("string", "empty", "date", "datetime"):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def convert(nama, force=False):
+    import ringkasan
+    import stream
+
+    with _locks[nama]:
+        if not force and _is_fresh(nama):
+            return parquet_path(nama)
+
+        src = source_path(nama)
+        CACHE_DIR.mkdir(exist_ok=True)
+        stat = src.stat()
+        # Workbook dibaca bertahap dan langsung ditulis ke Parquet; tidak pernah dimuat utuh
+        tmp = parquet_path(nama).with_suffix(f".parquet.{os.getpid()}.tmp")
+        hasil = stream.write(nama, src, tmp)
+        if not hasil["rows"]:
+            raise ValueError(f"{src.name} tidak berisi baris data")
+        os.replace(tmp, parquet_path(nama))
+        sha = _sha256(src)
+        ringkasan.simpan(nama, sha, hasil["ringkasan"])
+        _write_meta(nama, {
+            "source": src.name,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha,
+            "rows": hasil["rows"],
+            "schema": SCHEMA_VERSION,
+            "memori": hasil["memori"],
+        })
+        return parquet_path(nama)
+
+
+def partition_paths(nama):
+    # Nama file diawali TAHUNBULAN periode awal isinya, jadi urutan nama = urutan ingest per periode
+    folder = PARTISI_DIR / nama
+    return sorted(folder.glob("*.parquet")) if folder.exists() else []
+
+
+def _concat(frames):
+    # pd.concat menjadikan category dengan kategori berbeda sebagai object; gabungkan kategorinya
+    hasil = pd.concat(frames, ignore_index=True)
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype) and not isinstance(hasil[col].dtype, pd.CategoricalDtype):
+            hasil[col] = union_categoricals([frame[col].astype("category") for frame in frames], ignore_order=True)
+    return hasil
+
+
+def load_table(nama):
+    return pq.read_table(convert(nama), memory_map=True)
+
+
+def _read_parts(nama, stems):
+    folder = PARTISI_DIR / nama
+    return [pq.read_table(folder / f"{stem}.parquet", memory_map=True).to_pandas() for stem in stems]
+
+
+def load_df(nama):
+    df = load_table(nama).to_pandas()
+    parts = _read_parts(nama, [path.stem for path in partition_paths(nama)])
+    return _concat([df] + parts) if parts else df
+
+
+def dataset_version(nama):
+    # "<sha256 workbook>+<partisi>+<partisi>..."; partisi baru hanya menambah akhiran
+    convert(nama)
+    return "+".join([_read_meta(nama)["sha256"]] + [path.stem for path in partition_paths(nama)])
+
+
+def _new_parts(lama, baru):
+    # Partisi yang ditambahkan sejak versi lama, atau None jika perubahan bukan sekadar tambahan
+    a, b = lama.split("+"), baru.split("+")
+    if len(b) > len(a) and b[:len(a)] == a:
+        return b[len(a):]
+    return None
+
+
+def get_delta(nama, versi_lama):
+    # Baris (sudah disiapkan) yang masuk sejak versi_lama; None berarti perlu dibangun ulang penuh
+    stems = _new_parts(versi_lama, dataset_version(nama))
+    if stems is None:
+        return None
+    return _prepare(nama, _concat(_read_parts(nama, stems)))
+
+
+def memory_report(nama):
+    convert(nama)
+    memori = _read_meta(nama).get("memori", {})
+    df = pd.DataFrame(
+        [(col, sebelum, sesudah) for col, (sebelum, sesudah) in memori.items()],
+        columns=["Kolom", "Sebelum", "Sesudah"],
+    )
+    df["Hemat"] = df["Sebelum"] - df["Sesudah"]
+    return df.sort_values("Hemat", ascending=False, ignore_index=True)
+
+
+def _prepare(nama, df):
+    cfg = DATASETS[nama]
+    kolom = cfg["tanggal"]
+    if kolom in df.columns:
+        df[kolom] = pd.to_datetime(df[kolom], format=FORMAT_TANGGAL)
+        df['BULAN'] = df[kolom].dt.month
+        df['TAHUN'] = df[kolom].dt.year
+    df['BULAN_NAMA'] = df['BULAN'].map(bulan_mapping)
+    df['PERIODE'] = df['TAHUN'] * 100 + df['BULAN']
+
+    # Kolom turunan dihitung sekali di sini, supaya fungsi grafik tidak perlu mengubah frame
+    for col in cfg["label"]:
+        if col in df.columns:
+            df[f"{col}_LABEL"] = df[col].astype(str).astype("category")
+    for col, (kiri, kanan) in cfg["selisih"].items():
+        if kiri in df.columns and kanan in df.columns:
+            df[col] = df[kiri] - df[kanan]
+
+    # Urutkan per (TAHUN, BULAN) supaya setiap bulan menjadi satu rentang baris yang bersebelahan
+    return df.sort_values(['TAHUN', 'BULAN'], kind='stable', na_position='last').reset_index(drop=True)
+
+
+def _append(df, delta):
+    df = _concat([df, delta])
+    # Urutkan ulang hanya jika baris baru tidak jatuh setelah semua periode lama
+    lama = df['PERIODE'].iloc[:len(df) - len(delta)]
+    if lama.isna().any() or (len(lama) and delta['PERIODE'].min() < lama.max()):
+        df = df.sort_values(['TAHUN', 'BULAN'], kind='stable', na_position='last').reset_index(drop=True)
+    return df
+
+
+def _build_partitions(df):
+    # {(tahun, bulan): (awal, akhir)} posisi baris; baris tanpa tanggal ada di akhir dan tidak diindeks
+    kunci = df['PERIODE'].to_numpy(dtype=float)
+    n_valid = int(np.count_nonzero(~np.isnan(kunci)))
+    if n_valid == 0:
+        return {}
+
+    kunci = kunci[:n_valid]
+    batas = np.flatnonzero(np.diff(kunci)) + 1
+    starts = np.concatenate(([0], batas))
+    stops = np.concatenate((batas, [n_valid]))
+    return {
+        (int(kunci[start]) // 100, int(kunci[start]) % 100): (int(start), int(stop))
+        for start, stop in zip(starts, stops)
+    }
+
+
+def _get_cached(nama):
+    # Satu frame per dataset per proses server; dimuat ulang hanya jika file sumber berubah
+    versi = dataset_version(nama)
+    with _datasets_lock:
+        cached = _datasets.get(nama)
+        if cached is None or cached[0] != versi:
+            stems = _new_parts(cached[0], versi) if cached is not None else None
+            if stems is not None:
+                # Hanya partisi hasil ingest yang baru dibaca; frame lama dipakai ulang
+                df = _append(cached[1], _prepare(nama, _concat(_read_parts(nama, stems))))
+            else:
+                df = _prepare(nama, load_df(nama))
+            cached = (versi, df, _build_partitions(df))
+            _datasets[nama] = cached
+    return cached
+
+
+def get_dataset(nama):
+    # Salinan dangkal: tidak menyalin data, dan (copy-on-write, diaktifkan halaman) perubahan sesi tidak bocor ke cache
+    return _get_cached(nama)[1].copy(deep=False)
+
+
+def get_years(nama):
+    return sorted({tahun for tahun, _ in _get_cached(nama)[2]}, reverse=True)
+
+
+def filter_periode(nama, years, months):
+    _, df, partitions = _get_cached(nama)
+    return slice_periode(df, partitions, years, months)
+
+
+def slice_periode(df, partitions, years, months):
+    # partitions dari _build_partitions(df)
+    rentang = sorted(
+        partitions[(int(tahun), int(bulan))]
+        for tahun in years for bulan in months
+        if (int(tahun), int(bulan)) in partitions
+    )
+
+    # Gabungkan partisi yang bersebelahan (mis. semua bulan dalam satu tahun) menjadi satu slice
+    gabungan = []
+    for start, stop in rentang:
+        if gabungan and gabungan[-1][1] == start:
+            gabungan[-1][1] = stop
+        else:
+            gabungan.append([start, stop])
+
+    if not gabungan:
+        return df.iloc[0:0]
+    if len(gabungan) == 1:
+        # Slice tanpa salinan; dengan copy-on-write data baru disalin jika slice diubah
+        return df.iloc[gabungan[0][0]:gabungan[0][1]]
+    return pd.concat([df.iloc[start:stop] for start, stop in gabungan])
+
+
+if __name__ == "__main__":
+    for nama in DATASETS:
+        print(f"{nama}: {convert(nama)}")
+        laporan = memory_report(nama)
+        print(laporan.to_string(index=False))
+        print(f"Total hemat: {laporan['Hemat'].sum() / 1e6:.2f} MB")
@@ -0,0 +1,88 @@
+import logging
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Nilai kategori tak dikenal yang dicatat satu per satu; sisanya hanya masuk total
+MAKS_UNKNOWN = 1000
+
+
+class OneHotEncoder:
+    # Pengganti pd.get_dummies(df).reindex(columns=model_columns, fill_value=0): peta nilai kategori
+    # ke indeks kolom dibangun sekali dari model_columns, lalu baris diisi langsung ke array NumPy
+
+    def __init__(self, columns, kategori):
+        self.columns = list(columns)
+        self.kategori = list(kategori)
+        self.peta = {
+            kat: {col[len(kat) + 1:]: i for i, col in enumerate(self.columns) if col.startswith(f"{kat}_")}
+            for kat in self.kategori
+        }
+        dummy = {i for peta in self.peta.values() for i in peta.values()}
+        self.numerik = [(i, col) for i, col in enumerate(self.columns) if i not in dummy]
+        self._unknown = {kat: Counter() for kat in self.kategori}
+        self._total_unknown = dict.fromkeys(self.kategori, 0)
+        self._lock = threading.Lock()
+
+    def _catat(self, kat, nilai):
+        with self._lock:
+            counter = self._unknown[kat]
+            for v, n in nilai.items():
+                if not self._total_unknown[kat]:
+                    logger.warning("kategori %s=%r tidak dikenal model, dianggap kosong (nilai berikutnya hanya dihitung)", kat, v)
+                self._total_unknown[kat] += n
+                if v in counter or len(counter) < MAKS_UNKNOWN:
+                    counter[v] += n
+
+    def transform_one(self, row):
+        # Satu input form (dict) -> array (1, k); tanpa membuat DataFrame
+        X = np.zeros((1, len(self.columns)))
+        for i, col in self.numerik:
+            X[0, i] = row.get(col, 0)
+        for kat in self.kategori:
+            v = row.get(kat)
+            if v is None or (isinstance(v, float) and np.isnan(v)):
+                continue
+            i = self.peta[kat].get(str(v))
+            if i is None:
+                self._catat(kat, {str(v): 1})
+            else:
+                X[0, i] = 1.0
+        return X
+
+    def transform(self, df):
+        # Batch: kolom numerik disalin, kategori dipetakan per nilai unik lalu diisi sekaligus
+        X = np.zeros((len(df), len(self.columns)))
+        for i, col in self.numerik:
+            if col in df.columns:
+                X[:, i] = df[col].to_numpy(dtype=float)
+        baris = np.arange(len(df))
+        for kat in self.kategori:
+            if kat not in df.columns:
+                continue
+            s = df[kat]
+            if not isinstance(s.dtype, pd.CategoricalDtype):
+                s = s.astype("category")
+            teks = s.cat.categories.astype(str)
+            indeks = np.array([self.peta[kat].get(v, -1) for v in teks] + [-1])
+            kolom = indeks[s.cat.codes.to_numpy()]
+            ada = kolom >= 0
+            X[baris[ada], kolom[ada]] = 1.0
+
+            asing = teks[indeks[:-1] < 0]
+            if len(asing):
+                jumlah = s.astype(str)[s.notna()].value_counts()
+                self._catat(kat, jumlah[jumlah.index.isin(asing)].to_dict())
+        return X
+
+    def unknown_stats(self, top=5):
+        # Termasuk kategori acuan bila model dilatih dengan drop_first (kolom dummy-nya memang tidak ada)
+        with self._lock:
+            return {
+                kat: {"total": self._total_unknown[kat], "top": self._unknown[kat].most_common(top)}
+                for kat in self.kategori
+            }
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# ========== Kolom Input Model ==========
+KOLOM_INPUT = {
+    "ina_cbgs": ["UMUR_TAHUN", "KELAS_RAWAT", "PTD", "DIAGLIST", "PROCLIST", "VERSI_INACBG",
+                 "TARIF_RS", "TARIF_INACBG", "LOS", "DISCHARGE_STATUS"],
+    "non_cbgs": ["jnspelayanan", "jenis_klaim", "diagnosa", "jumlah", "tarifrs", "tagihan"],
+    "obat": ["jenisresep", "obat", "jmlobat", "BIAYA_TAGIHAN", "jmlobatsetuju", "biayasetuju", "TGL_RESEP"],
+}
+
+# Nama kolom di ekspor e-Klaim yang berbeda dengan nama input form
+ALIAS = {
+    "ina_cbgs": {"TARIF_INACBG": "TOTAL_TARIF"},
+    "non_cbgs": {},
+    "obat": {},
+}
+
+
+def _check_columns(nama, df):
+    for kolom, alias in ALIAS[nama].items():
+        if kolom not in df.columns and alias in df.columns:
+            df = df.rename(columns={alias: kolom})
+    hilang = [kolom for kolom in KOLOM_INPUT[nama] if kolom not in df.columns]
+    if hilang:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(hilang)}")
+    return df
+
+
+def _to_datetime(s):
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    return pd.to_datetime(s, dayfirst=True, errors="coerce")
+
+
+def _count_codes(s):
+    # Sama dengan len(str(kode).split(';')) pada form prediksi
+    return s.astype(str).str.count(";") + 1
+
+
+def fitur_ina_cbgs(df):
+    df = _check_columns("ina_cbgs", df)
+    X = df[KOLOM_INPUT["ina_cbgs"]].copy()
+    X["DIAGLIST"] = X["DIAGLIST"].astype(str)
+    X["PROCLIST"] = X["PROCLIST"].astype(str)
+    X["SELISIH_TARIF"] = X["TARIF_RS"] - X["TARIF_INACBG"]
+    X["JUMLAH_DIAG"] = _count_codes(X["DIAGLIST"])
+    X["JUMLAH_PROC"] = _count_codes(X["PROCLIST"])
+    X["TARIF_MELEBIHI_INACBG"] = (X["SELISIH_TARIF"] > 0).astype(int)
+    return X
+
+
+def fitur_non_cbgs(df):
+    df = _check_columns("non_cbgs", df)
+    X = df[KOLOM_INPUT["non_cbgs"]].copy()
+
+    if "lama_rawat" in df.columns:
+        X["lama_rawat"] = df["lama_rawat"]
+    elif "tglmasuk" in df.columns and "tglpulang" in df.columns:
+        X["lama_rawat"] = (_to_datetime(df["tglpulang"]) - _to_datetime(df["tglmasuk"])).dt.days.fillna(0)
+    else:
+        X["lama_rawat"] = 0
+
+    kolom_tanggal = "tanggal" if "tanggal" in df.columns else "tglmasuk"
+    if kolom_tanggal not in df.columns:
+        raise ValueError("Kolom tidak ditemukan: tanggal")
+    tanggal = _to_datetime(df[kolom_tanggal])
+    X["day"] = tanggal.dt.day
+    X["month"] = tanggal.dt.month
+    X["year"] = tanggal.dt.year
+    return X
+
+
+def fitur_obat(df):
+    df = _check_columns("obat", df)
+    X = df[KOLOM_INPUT["obat"]].drop(columns="TGL_RESEP")
+
+    tgl_resep = _to_datetime(df["TGL_RESEP"])
+    X["bulan_resep"] = tgl_resep.dt.month
+    X["hari_resep"] = tgl_resep.dt.day
+    X["hari_ke"] = tgl_resep.dt.weekday
+
+    X["selisih_jmlobat"] = X["jmlobat"] - X["jmlobatsetuju"]
+    X["selisih_biaya"] = X["BIAYA_TAGIHAN"] - X["biayasetuju"]
+    X["proporsi_biaya_disetujui"] = X["biayasetuju"] / np.where(X["BIAYA_TAGIHAN"] != 0, X["BIAYA_TAGIHAN"], 1)
+    return X
+
+
+FITUR = {
+    "ina_cbgs": fitur_ina_cbgs,
+    "non_cbgs": fitur_non_cbgs,
+    "obat": fitur_obat,
+}
@@ -0,0 +1,206 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# ========== Forest Datar ==========
+# Semua pohon RandomForest/ExtraTrees disalin ke array NumPy bersambung (fitur, threshold, anak kiri/kanan,
+# probabilitas daun). Evaluasi menelusuri semua pohon untuk semua baris sekaligus, tanpa validasi input
+# sklearn dan tanpa thread joblib per panggilan. Unggul untuk input form (beberapa baris); untuk batch
+# besar penelusuran C sklearn tetap lebih cepat, jadi batch di atas BATAS_BARIS memakai predict_proba asli
+
+# Batas elemen (baris x pohon) per potongan, supaya array indeks node tetap kecil
+MAKS_ELEMEN = 1_000_000
+# Titik impas terhadap predict_proba sklearn (lihat check()); pohon dalam menurunkan titik ini
+BATAS_BARIS = 32
+
+
+class FlatForest:
+    def __init__(self, feature, threshold, kiri, kanan, kiri_bila_kosong, nilai, akar, kedalaman, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.kiri = kiri
+        self.kanan = kanan
+        self.kiri_bila_kosong = kiri_bila_kosong
+        self.nilai = nilai
+        self.akar = akar
+        self.kedalaman = int(kedalaman)
+        self.classes_ = classes
+        # Turunan untuk penelusuran: anak kanan/kiri berselang-seling (satu gather per level)
+        self._anak = np.ascontiguousarray(np.stack([kanan, kiri], axis=1).ravel(), dtype=np.int32)
+        self._feature = feature.astype(np.int32)
+        self._daun_mask = kiri == np.arange(len(kiri))
+        self._ada_kosong = bool(kiri_bila_kosong.any())
+
+    @classmethod
+    def from_estimator(cls, forest):
+        if not hasattr(forest, "estimators_") or not hasattr(forest, "classes_"):
+            raise TypeError(f"{type(forest).__name__} bukan forest klasifikasi yang sudah di-fit")
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise TypeError("Forest multi-output tidak didukung")
+
+        feature, threshold, kiri, kanan, kosong, nilai, akar = [], [], [], [], [], [], []
+        awal = 0
+        for est in forest.estimators_:
+            tree = est.tree_
+            n = tree.node_count
+            daun = tree.children_left == -1
+            node = np.arange(n)
+            # Daun menunjuk ke dirinya sendiri (penanda daun di evaluator)
+            feature.append(np.where(daun, 0, tree.feature))
+            threshold.append(tree.threshold)
+            kiri.append(np.where(daun, node, tree.children_left) + awal)
+            kanan.append(np.where(daun, node, tree.children_right) + awal)
+            kosong.append(getattr(tree, "missing_go_to_left", np.zeros(n, dtype=np.uint8)).astype(bool))
+            # Sama dengan DecisionTreeClassifier.predict_proba: nilai daun dinormalisasi per node
+            v = tree.value[:, 0, :].astype(np.float64)
+            total = v.sum(axis=1, keepdims=True)
+            nilai.append(v / np.where(total == 0, 1, total))
+            akar.append(awal)
+            awal += n
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(feature), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(threshold), dtype=np.float64),
+            kiri=np.ascontiguousarray(np.concatenate(kiri), dtype=np.intp),
+            kanan=np.ascontiguousarray(np.concatenate(kanan), dtype=np.intp),
+            kiri_bila_kosong=np.concatenate(kosong),
+            nilai=np.ascontiguousarray(np.concatenate(nilai)),
+            akar=np.array(akar, dtype=np.intp),
+            kedalaman=max(est.tree_.max_depth for est in forest.estimators_),
+            classes=np.asarray(forest.classes_),
+        )
+
+    def _daun(self, X):
+        # Semua pasangan (baris, pohon) turun satu level per iterasi; yang sudah sampai daun dikeluarkan,
+        # jadi biaya mengikuti panjang jalur sebenarnya, bukan kedalaman pohon terdalam.
+        # X float32 seperti sklearn; perbandingan <= dengan threshold float64
+        n_pohon = len(self.akar)
+        datar = X.ravel()
+        ada_nan = self._ada_kosong and np.isnan(datar).any()
+        hasil = np.tile(self.akar.astype(np.int32), len(X))
+        pos = np.arange(len(hasil))
+        offset = np.repeat(np.arange(len(X), dtype=np.intp) * X.shape[1], n_pohon)
+        lanjut = ~self._daun_mask[hasil]
+        node, pos, offset = hasil[lanjut], pos[lanjut], offset[lanjut]
+        while len(node):
+            x = datar[offset + self._feature[node]]
+            ke_kiri = x <= self.threshold[node]
+            if ada_nan:
+                ke_kiri |= np.isnan(x) & self.kiri_bila_kosong[node]
+            node = self._anak[2 * node + ke_kiri]
+            selesai = self._daun_mask[node]
+            if selesai.any():
+                hasil[pos[selesai]] = node[selesai]
+                lanjut = ~selesai
+                node, pos, offset = node[lanjut], pos[lanjut], offset[lanjut]
+        return hasil.reshape(len(X), n_pohon)
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        hasil = np.empty((len(X), self.nilai.shape[1]))
+        langkah = max(1, MAKS_ELEMEN // len(self.akar))
+        for i in range(0, len(X), langkah):
+            hasil[i:i + langkah] = self.nilai[self._daun(X[i:i + langkah])].mean(axis=1)
+        return hasil
+
+    def save(self, path):
+        np.savez(
+            path, feature=self.feature, threshold=self.threshold, kiri=self.kiri, kanan=self.kanan,
+            kiri_bila_kosong=self.kiri_bila_kosong, nilai=self.nilai, akar=self.akar,
+            kedalaman=self.kedalaman, classes=self.classes_,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            return cls(**{k: f[k] for k in f.files})
+
+
+class FlatPipeline:
+    # Pipeline sklearn/imblearn: langkah sebelum model tetap dijalankan (pipeline[:-1].transform,
+    # sampler imblearn dilewati saat transform), hanya forest di langkah terakhir yang diganti
+    def __init__(self, model):
+        self.model = model
+        if hasattr(model, "steps"):
+            self.prep, forest = model[:-1], model[-1]
+        else:
+            self.prep, forest = None, model
+        self.columns = getattr(forest, "feature_names_in_", None) if self.prep is None else None
+        self.forest = FlatForest.from_estimator(forest)
+        self.classes_ = self.forest.classes_
+
+    def transform(self, X):
+        if self.prep is not None:
+            X = self.prep.transform(X)
+        elif self.columns is not None and isinstance(X, pd.DataFrame):
+            X = X[list(self.columns)]
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        return np.asarray(X, dtype=np.float32)
+
+    def predict_proba(self, X):
+        if len(X) > BATAS_BARIS:
+            return self.model.predict_proba(X)
+        return self.forest.predict_proba(self.transform(X))
+
+
+def flatten(model):
+    return FlatPipeline(model)
+
+
+# ========== Cek Kesetaraan & Latensi ==========
+def _waktu(fungsi, ulang):
+    waktu = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        waktu.append(time.perf_counter() - mulai)
+    return float(np.median(waktu))
+
+
+def check(model, X, ukuran=(1, 100, 100_000), ulang=5, threshold=0.8, seed=0):
+    # X: fitur historis (hasil fitur.FITUR). Bandingkan skor kelas 1 dengan predict_proba asli,
+    # lalu ukur latensi median kedua jalur pada 1/100/100k baris (diambil ulang dari X).
+    # Evaluator datar selalu dipakai di sini (tanpa BATAS_BARIS) supaya titik impasnya terlihat
+    flat = flatten(model)
+    evaluasi = lambda df: flat.forest.predict_proba(flat.transform(df))
+    asli = model.predict_proba(X)[:, 1]
+    datar = evaluasi(X)[:, 1]
+    hasil = {
+        "rows": len(X),
+        "max_abs_diff": float(np.abs(asli - datar).max()),
+        "label_sama": float(((asli >= threshold) == (datar >= threshold)).mean()),
+        "latensi": [],
+    }
+
+    rng = np.random.default_rng(seed)
+    for n in ukuran:
+        contoh = X.iloc[rng.integers(0, len(X), n)].reset_index(drop=True)
+        u = ulang if n < 10_000 else 1
+        sklearn_s = _waktu(lambda: model.predict_proba(contoh), u)
+        flat_s = _waktu(lambda: evaluasi(contoh), u)
+        hasil["latensi"].append({"rows": n, "sklearn_s": sklearn_s, "flat_s": flat_s, "speedup": sklearn_s / flat_s})
+    return hasil
+
+
+if __name__ == "__main__":
+    import data
+    import fitur
+    import models
+
+    parser = argparse.ArgumentParser(description="Cek kesetaraan dan latensi forest datar terhadap predict_proba sklearn")
+    parser.add_argument("--datasets", nargs="+", choices=[n for n, cfg in models.MODELS.items() if cfg.get("flat")],
+                        default=[n for n, cfg in models.MODELS.items() if cfg.get("flat")])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 100_000])
+    args = parser.parse_args()
+
+    for nama in args.datasets:
+        model = models.get_model(nama)["model"]
+        X = fitur.FITUR[nama](data.load_df(nama)).dropna()
+        hasil = check(model, X, ukuran=args.sizes, threshold=models.THRESHOLD)
+        print(f"{nama}: {hasil['rows']:,} baris, selisih maks {hasil['max_abs_diff']:.2e}, label sama {hasil['label_sama']:.2%}")
+        print(pd.DataFrame(hasil["latensi"]).to_string(index=False))
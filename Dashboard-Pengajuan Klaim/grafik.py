@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+import data
+import timing
+
+# Batas total perkiraan ukuran figure yang disimpan; entri terlama dibuang lebih dulu
+MAKS_BYTE = 64 * 1024 * 1024
+
+# key -> (perkiraan byte, figure); figure dipakai bersama semua sesi dan tidak boleh diubah setelah disimpan
+_cache = OrderedDict()
+_ukuran = 0
+_stats = {"hit": 0, "miss": 0}
+_lock = threading.Lock()
+
+
+def _key(nama, chart_id, periode, opsi):
+    return (
+        nama, data.dataset_version(nama), chart_id,
+        tuple(sorted(periode["years"])), tuple(sorted(periode["months"])),
+        tuple(sorted(opsi.items())),
+    )
+
+
+def _perkiraan(nilai):
+    # Ukuran data figure tanpa serialisasi: array NumPy dari nbytes, teks dari panjangnya
+    if isinstance(nilai, np.ndarray):
+        if nilai.dtype == object:
+            return sum(_perkiraan(v) for v in nilai.ravel())
+        return nilai.nbytes
+    if isinstance(nilai, dict):
+        return sum(len(k) + _perkiraan(v) for k, v in nilai.items())
+    if isinstance(nilai, (list, tuple)):
+        return sum(_perkiraan(v) for v in nilai)
+    if isinstance(nilai, str):
+        return len(nilai)
+    return 8
+
+
+def ukuran_figure(fig):
+    return sum(_perkiraan(trace.to_plotly_json()) for trace in fig.data) + _perkiraan(fig.layout.to_plotly_json())
+
+
+def figure(nama, chart_id, periode, buat, **opsi):
+    # buat(**opsi) membangun figure dari data terfilter; hanya dipanggil saat cache miss
+    global _ukuran
+    key = _key(nama, chart_id, periode, opsi)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+            _stats["hit"] += 1
+            return entry[1]
+        _stats["miss"] += 1
+
+    with timing.stage(f"chart:{chart_id}"):
+        fig = buat(**opsi)
+    if fig is None:
+        return None
+    ukuran = ukuran_figure(fig)
+
+    with _lock:
+        if key not in _cache:
+            _cache[key] = (ukuran, fig)
+            _ukuran += ukuran
+        while _ukuran > MAKS_BYTE and len(_cache) > 1:
+            _, (lama, _) = _cache.popitem(last=False)
+            _ukuran -= lama
+    return fig
+
+
+def stats():
+    with _lock:
+        total = _stats["hit"] + _stats["miss"]
+        return {
+            "hit": _stats["hit"],
+            "miss": _stats["miss"],
+            "hit_rate": _stats["hit"] / total if total else 0.0,
+            "entries": len(_cache),
+            "bytes": _ukuran,
+        }
+
+
+def panel():
+    # Ditampilkan bersama panel waktu proses (checkbox "Tampilkan Waktu Proses")
+    if not st.session_state.get("show_timing"):
+        return
+    s = stats()
+    st.sidebar.markdown(
+        f"**Cache grafik:** {s['hit']} hit / {s['miss']} miss ({s['hit_rate']:.0%}), "
+        f"{s['entries']} grafik, {s['bytes'] / 1e6:.1f} MB"
+    )
@@ -0,0 +1,195 @@
+import bisect
+import heapq
+import os
+import pickle
+import re
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+BASE_DIR = Path(__file__).resolve().parent
+CACHE_DIR = BASE_DIR / ".cache"
+
+INDEX_VERSION = 1
+
+# ========== Sumber Kode ==========
+SUMBER = {
+    "icd10": {"file": "ICD-10 e-klaim.csv", "kode": "CODE", "label": ["DISPLAY"]},
+    "icd9": {"file": "Icd-9-CM.xlsx", "kode": "Kode", "label": ["Deskripsi (Indonesia)", "Deskripsi (English)"]},
+}
+
+_TOKEN = re.compile(r"[0-9a-z]+")
+
+
+def _tokens(teks):
+    return _TOKEN.findall(str(teks).lower())
+
+
+def _normalize_code(kode):
+    return str(kode).strip().upper()
+
+
+class KodeIndex:
+    def __init__(self, codes, labels):
+        # labels: daftar label per kode, label pertama dipakai untuk tampilan
+        self.codes = codes
+        self.labels = labels
+        self.by_code = {_normalize_code(kode): i for i, kode in enumerate(codes)}
+        self.sorted_codes = sorted(self.by_code)
+
+        postings = {}
+        for i, label_kode in enumerate(labels):
+            for label in label_kode:
+                for token in _tokens(label):
+                    postings.setdefault(token, set()).add(i)
+        self.tokens = sorted(postings)
+        self.postings = [frozenset(postings[token]) for token in self.tokens]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def format(self, kode):
+        i = self.by_code.get(_normalize_code(kode))
+        if i is None:
+            return str(kode)
+        return f"{self.codes[i]} - {self.labels[i][0]}"
+
+    def _code_prefix(self, prefix, maks):
+        mulai = bisect.bisect_left(self.sorted_codes, prefix)
+        hasil = []
+        for kode in self.sorted_codes[mulai:mulai + maks]:
+            if not kode.startswith(prefix):
+                break
+            hasil.append(self.by_code[kode])
+        return hasil
+
+    def _token_prefix(self, prefix):
+        mulai = bisect.bisect_left(self.tokens, prefix)
+        hasil = set()
+        for j in range(mulai, len(self.tokens)):
+            if not self.tokens[j].startswith(prefix):
+                break
+            hasil |= self.postings[j]
+        return hasil
+
+    def search(self, query, limit=20, offset=0):
+        query = str(query).strip()
+        if not query:
+            return []
+
+        # Urutan: kode persis, awalan kode, lalu label yang memuat semua kata (awalan)
+        kode = _normalize_code(query)
+        # Hanya offset + limit hasil teratas yang perlu dikumpulkan
+        urutan = self._code_prefix(kode, offset + limit)
+
+        kata = _tokens(query)
+        if kata:
+            cocok = None
+            for token in kata:
+                kandidat = self._token_prefix(token)
+                cocok = kandidat if cocok is None else cocok & kandidat
+                if not cocok:
+                    break
+            if cocok:
+                sudah = set(urutan)
+                query_lower = query.lower()
+                label_match = heapq.nsmallest(
+                    offset + limit,
+                    (i for i in cocok if i not in sudah),
+                    key=lambda i: (not self.labels[i][0].lower().startswith(query_lower), len(self.labels[i][0]), i)
+                )
+                urutan.extend(label_match)
+
+        return [self.codes[i] for i in urutan[offset:offset + limit]]
+
+
+def _fingerprint(path):
+    stat = path.stat()
+    return (INDEX_VERSION, stat.st_mtime_ns, stat.st_size)
+
+
+def _read_source(jenis):
+    cfg = SUMBER[jenis]
+    path = BASE_DIR / cfg["file"]
+    if path.suffix == ".csv":
+        df = pd.read_csv(path, dtype={cfg["kode"]: str})
+    else:
+        df = pd.read_excel(path, dtype={cfg["kode"]: str})
+    df = df.dropna(subset=[cfg["kode"]])
+
+    codes = [_normalize_code(kode) for kode in df[cfg["kode"]]]
+    labels = [
+        [str(label).strip() for label in baris if pd.notna(label)] or [""]
+        for baris in df[cfg["label"]].itertuples(index=False)
+    ]
+    return KodeIndex(codes, labels)
+
+
+def build_index(jenis, force=False):
+    path = BASE_DIR / SUMBER[jenis]["file"]
+    index_path = CACHE_DIR / f"{jenis}_index.pkl"
+    fingerprint = _fingerprint(path)
+
+    if not force and index_path.exists():
+        try:
+            with open(index_path, "rb") as f:
+                saved_fingerprint, index = pickle.load(f)
+            if saved_fingerprint == fingerprint:
+                return index
+        except Exception:
+            pass
+
+    index = _read_source(jenis)
+    CACHE_DIR.mkdir(exist_ok=True)
+    tmp = index_path.with_suffix(f".pkl.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump((fingerprint, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, index_path)
+    return index
+
+
+@st.cache_resource(show_spinner=False, max_entries=2 * len(SUMBER))
+def _get_index(jenis, fingerprint):
+    return build_index(jenis)
+
+
+def get_index(jenis):
+    # Fingerprint sumber ikut jadi kunci cache, jadi file kode yang diganti dimuat ulang tanpa restart
+    return _get_index(jenis, _fingerprint(BASE_DIR / SUMBER[jenis]["file"]))
+
+
+def _reset_halaman(key):
+    st.session_state[f"{key}_halaman"] = 1
+
+
+def pilih_kode(label, jenis, key, limit=20):
+    # Dipanggil di luar st.form: pencarian dijalankan di server, browser hanya menerima top-k hasil
+    index = get_index(jenis)
+    key_terpilih = f"{key}_terpilih"
+    terpilih = st.session_state.setdefault(key_terpilih, [])
+
+    col_cari, col_halaman = st.columns([4, 1])
+    with col_cari:
+        # Pencarian baru selalu mulai dari halaman 1
+        query = st.text_input(
+            f"Cari {label}", key=f"{key}_query", help="Ketik kode atau kata kunci",
+            on_change=_reset_halaman, args=(key,),
+        )
+    with col_halaman:
+        halaman = st.number_input("Halaman", min_value=1, step=1, key=f"{key}_halaman")
+
+    hasil = index.search(query, limit=limit, offset=(halaman - 1) * limit)
+    options = terpilih + [kode for kode in hasil if kode not in terpilih]
+
+    pilihan = st.multiselect(label, options, default=terpilih, format_func=index.format)
+    st.session_state[key_terpilih] = pilihan
+    return pilihan
+
+
+if __name__ == "__main__":
+    # Impor ulang sebagai modul agar index tersimpan sebagai icd.KodeIndex, bukan __main__.KodeIndex
+    import icd
+
+    for jenis in icd.SUMBER:
+        print(f"{jenis}: {len(icd.build_index(jenis, force=True))} kode")
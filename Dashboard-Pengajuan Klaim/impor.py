@@ -0,0 +1,97 @@
+import ast
+import importlib
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+PAGES = [BASE_DIR / "Main.py"] + sorted((BASE_DIR / "pages").glob("*.py"))
+
+# {modul: detik} untuk modul yang diimpor lewat lazy() di proses ini
+_waktu = {}
+_lock = threading.Lock()
+
+
+class _LazyModule:
+    # Modul baru diimpor saat atributnya pertama kali dipakai (mis. menu "Prediksi" dipilih)
+    def __init__(self, nama):
+        self._nama = nama
+        self._modul = None
+
+    def _load(self):
+        if self._modul is None:
+            with _lock:
+                if self._modul is None:
+                    mulai = time.perf_counter()
+                    self._modul = importlib.import_module(self._nama)
+                    _waktu.setdefault(self._nama, time.perf_counter() - mulai)
+        return self._modul
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        status = "dimuat" if self._modul is not None else "belum dimuat"
+        return f"<lazy {self._nama} ({status})>"
+
+
+def lazy(nama):
+    return _LazyModule(nama)
+
+
+def loaded():
+    with _lock:
+        return dict(_waktu)
+
+
+def _top_level_imports(path):
+    # Hanya impor di tingkat modul yang dibayar saat halaman pertama kali dibuka
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    nama = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            nama.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            nama.append(node.module)
+    return list(dict.fromkeys(nama))
+
+
+def _cold_import_time(modules):
+    # Diukur di proses baru supaya modul yang sudah dimuat tidak ikut terhitung nol;
+    # streamlit sudah dimuat oleh server sebelum halaman dijalankan, jadi tidak dihitung
+    kode = (
+        "import sys, time\n"
+        "import streamlit\n"
+        f"sys.path.insert(0, {str(BASE_DIR)!r})\n"
+        "hasil = []\n"
+        f"for nama in {modules!r}:\n"
+        "    mulai = time.perf_counter()\n"
+        "    try:\n"
+        "        __import__(nama)\n"
+        "        hasil.append((nama, time.perf_counter() - mulai, ''))\n"
+        "    except Exception as e:\n"
+        "        hasil.append((nama, time.perf_counter() - mulai, type(e).__name__))\n"
+        "print(repr(hasil))\n"
+    )
+    keluaran = subprocess.run([sys.executable, "-c", kode], capture_output=True, text=True, cwd=BASE_DIR)
+    baris = keluaran.stdout.strip().splitlines()
+    return ast.literal_eval(baris[-1]) if baris else []
+
+
+def report():
+    rows = []
+    for path in PAGES:
+        for modul, detik, error in _cold_import_time(_top_level_imports(path)):
+            rows.append({"halaman": path.stem, "modul": modul, "detik": round(detik, 3), "error": error})
+    return rows
+
+
+if __name__ == "__main__":
+    total = {}
+    for row in report():
+        total[row["halaman"]] = total.get(row["halaman"], 0) + row["detik"]
+        print(f"{row['halaman']:<16} {row['modul']:<32} {row['detik']:>7.3f} s {row['error']}")
+    for halaman, detik in total.items():
+        print(f"{halaman}: {detik:.3f} s")
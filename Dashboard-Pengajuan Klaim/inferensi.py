@@ -0,0 +1,96 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import pandas as pd
+
+import models
+
+# ========== Micro-batch Inferensi ==========
+# Opsional (KLAIM_MICROBATCH=1): permintaan prediksi dari semua sesi masuk antrean per model dan
+# digabung menjadi satu predict_proba tiap beberapa milidetik, jadi beban naik dengan ukuran batch,
+# bukan dengan jumlah sesi yang terbuka
+AKTIF = os.environ.get("KLAIM_MICROBATCH", "0") == "1"
+MAKS_BATCH = 256
+TUNGGU_S = 0.005
+
+_workers = {}
+_workers_lock = threading.Lock()
+
+
+class Worker:
+    def __init__(self, nama):
+        self.nama = nama
+        self.antrean = queue.Queue()
+        self.stats = {"request": 0, "batch": 0, "max_batch": 0}
+        self._lock = threading.Lock()
+        self.thread = threading.Thread(target=self._jalan, name=f"inferensi-{nama}", daemon=True)
+        self.thread.start()
+
+    def submit(self, input_data):
+        fut = Future()
+        self.antrean.put((input_data, fut))
+        return fut
+
+    def _ambil(self):
+        # Tunggu permintaan pertama, lalu kumpulkan yang datang dalam TUNGGU_S berikutnya
+        batch = [self.antrean.get()]
+        batas = time.perf_counter() + TUNGGU_S
+        while len(batch) < MAKS_BATCH:
+            sisa = batas - time.perf_counter()
+            if sisa <= 0:
+                break
+            try:
+                batch.append(self.antrean.get(timeout=sisa))
+            except queue.Empty:
+                break
+        return [(x, fut) for x, fut in batch if fut.set_running_or_notify_cancel()]
+
+    def _jalan(self):
+        while True:
+            batch = self._ambil()
+            if not batch:
+                continue
+            with self._lock:
+                self.stats["request"] += len(batch)
+                self.stats["batch"] += 1
+                self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+            try:
+                scores = models.predict_scores(self.nama, pd.DataFrame([x for x, _ in batch]))
+            except Exception:
+                # Satu input rusak tidak boleh menggagalkan permintaan lain di batch yang sama
+                for x, fut in batch:
+                    try:
+                        fut.set_result(float(models.predict_scores(self.nama, pd.DataFrame([x]))[0]))
+                    except Exception as e:
+                        fut.set_exception(e)
+                continue
+            for (_, fut), score in zip(batch, scores):
+                fut.set_result(float(score))
+
+
+def worker(nama):
+    with _workers_lock:
+        if nama not in _workers:
+            _workers[nama] = Worker(nama)
+        return _workers[nama]
+
+
+def submit(nama, input_data):
+    # Future berisi skor (float) satu klaim
+    return worker(nama).submit(input_data)
+
+
+def stats():
+    with _workers_lock:
+        workers = dict(_workers)
+    hasil = {}
+    for nama, w in workers.items():
+        with w._lock:
+            s = dict(w.stats)
+        s["rata_batch"] = s["request"] / s["batch"] if s["batch"] else 0.0
+        s["antrean"] = w.antrean.qsize()
+        hasil[nama] = s
+    return hasil
@@ -0,0 +1,126 @@
+import argparse
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+import data
+import ringkasan
+import stream
+
+
+def validate(nama, df):
+    # Dipanggil per potongan (stream.write); tanggal sudah diparse, nilai tidak valid menjadi NaT.
+    # Kolom harus sama dengan dataset yang sudah ada; kolom tambahan dibuang
+    kolom = pq.read_schema(data.convert(nama)).names
+    hilang = [col for col in kolom if col not in df.columns]
+    if hilang:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(hilang)}")
+    df = df[kolom]
+
+    tanggal = data.DATASETS[nama]["tanggal"]
+    if df[tanggal].isna().any():
+        raise ValueError(f"{int(df[tanggal].isna().sum())} baris dengan {tanggal} kosong/tidak valid (format {data.FORMAT_TANGGAL})")
+
+    if "status" in df.columns and not df["status"].isin([0, 1]).all():
+        raise ValueError("Kolom status hanya boleh berisi 0 atau 1")
+    return df
+
+
+def row_keys(nama, df):
+    # Kunci teks per baris dari data.KUNCI; tipe dinormalisasi supaya riwayat (Parquet) dan ekspor baru
+    # (csv/xlsx mentah) menghasilkan teks yang sama. NaN jika semua kolom kunci kosong
+    bagian = []
+    for col in data.KUNCI[nama]:
+        s = df[col]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            teks = s.dt.strftime("%Y-%m-%d")
+        else:
+            teks = s.astype(str)
+            if pd.api.types.is_numeric_dtype(s):
+                teks = teks.str.replace(r"\.0$", "", regex=True)
+        bagian.append(teks.where(s.notna(), ""))
+    kunci = bagian[0].str.cat(bagian[1:], sep="\x1f") if len(bagian) > 1 else bagian[0]
+    return kunci.where(df[data.KUNCI[nama]].notna().any(axis=1))
+
+
+def _periode_partisi(path):
+    # Nama partisi "AWAL-AKHIR-sha" (YYYYMM); nama lama "AKHIR-sha" hanya diketahui batas akhirnya
+    bagian = path.stem.split("-")
+    return (int(bagian[0]), int(bagian[1])) if len(bagian) == 3 else (0, int(bagian[0]))
+
+
+def existing_keys(nama, periode):
+    # Kunci riwayat untuk satu periode YYYYMM: hanya partisi yang rentangnya memuat periode itu
+    # (plus workbook dasar, disaring per TAHUN/BULAN) yang dibaca, dan hanya kolom kuncinya
+    tahun, bulan = divmod(periode, 100)
+    paths = [data.convert(nama)] + [
+        path for path in data.partition_paths(nama)
+        if _periode_partisi(path)[0] <= periode <= _periode_partisi(path)[1]
+    ]
+    keys = set()
+    for path in paths:
+        df = pq.read_table(path, columns=data.KUNCI[nama], filters=[("TAHUN", "=", tahun), ("BULAN", "=", bulan)]).to_pandas()
+        keys.update(row_keys(nama, df).dropna())
+    return keys
+
+
+def ingest(nama, path):
+    sha = data._sha256(path)[:12]
+    if any(p.stem.endswith(f"-{sha}") for p in data.partition_paths(nama)):
+        return {"file": str(path), "status": "sudah pernah di-ingest", "rows": 0}
+
+    # Baris yang kuncinya sudah ada (di riwayat atau sebelumnya di file yang sama) dianggap kiriman ulang;
+    # baris tanpa kunci tetap masuk. Kunci riwayat dibaca per periode yang muncul di file
+    keys = {}
+    jumlah_baca = 0
+
+    def saring(df):
+        nonlocal jumlah_baca
+        df = validate(nama, df)
+        jumlah_baca += len(df)
+        kunci = row_keys(nama, df)
+        periode = (df["TAHUN"] * 100 + df["BULAN"]).astype(int)
+        for p in periode.unique():
+            if p not in keys:
+                keys[p] = existing_keys(nama, int(p))
+
+        ada = kunci.notna()
+        sudah = pd.Series([k in keys[p] for k, p in zip(kunci, periode)], index=df.index, dtype=bool)
+        baru = ~(ada & (sudah | kunci.duplicated()))
+        for k, p in zip(kunci[baru & ada], periode[baru & ada]):
+            keys[p].add(k)
+        return df[baru]
+
+    folder = data.PARTISI_DIR / nama
+    folder.mkdir(parents=True, exist_ok=True)
+    tmp = folder / f"{sha}.parquet.{os.getpid()}.tmp"
+    hasil = stream.write(nama, path, tmp, ubah=saring, errors="coerce")
+    if not hasil["rows"]:
+        return {"file": str(path), "status": "semua baris duplikat", "rows": 0, "read": jumlah_baca}
+
+    periode = hasil["periode"]
+    out = folder / f"{periode[0]}-{periode[-1]}-{sha}.parquet"
+    os.replace(tmp, out)
+    ringkasan.simpan(nama, out.stem, hasil["ringkasan"])
+
+    return {
+        "file": str(path),
+        "status": "ok",
+        "partisi": out.name,
+        "read": jumlah_baca,
+        "rows": hasil["rows"],
+        "duplikat": jumlah_baca - hasil["rows"],
+        "periode": periode,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tambahkan ekspor klaim bulanan sebagai partisi baru")
+    parser.add_argument("nama", choices=list(data.DATASETS))
+    parser.add_argument("files", nargs="+", type=Path, help="File ekspor .xlsx atau .csv")
+    args = parser.parse_args()
+
+    for file in args.files:
+        print(ingest(args.nama, file))
@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+
+import query
+import timing
+
+# ========== Kolom KPI ==========
+# "count": kolom yang dihitung sebagai jumlah klaim, "values": kolom rupiah yang dijumlahkan
+KPI_COLUMNS = {
+    "ina_cbgs": {"count": "SEP", "values": ["TARIF_RS", "TOTAL_TARIF"]},
+    "non_cbgs": {"count": "nama", "values": ["tarifrs", "tagihan"]},
+    "obat": {"count": "status", "values": ["biayasetuju", "BIAYA_TAGIHAN"]},
+}
+
+
+@dataclass(frozen=True)
+class Ringkasan:
+    jumlah: int
+    sums: dict
+
+
+@dataclass(frozen=True)
+class KPI:
+    total: Ringkasan
+    disetujui: Ringkasan
+    ditolak: Ringkasan
+
+    @property
+    def persen_disetujui(self):
+        return (self.disetujui.jumlah / self.total.jumlah) * 100 if self.total.jumlah else 0
+
+    @property
+    def persen_ditolak(self):
+        return (self.ditolak.jumlah / self.total.jumlah) * 100 if self.total.jumlah else 0
+
+
+def _ringkasan(df_agg, values):
+    return Ringkasan(
+        jumlah=int(df_agg["JUMLAH"].sum()),
+        sums={col: df_agg[col].sum() for col in values},
+    )
+
+
+@timing.instrument("kpi")
+def compute(nama, df, periode=None):
+    # Satu groupby per status untuk semua metrik kartu (jumlah + total rupiah)
+    cfg = KPI_COLUMNS[nama]
+    if query.uses_sql():
+        agg = {"JUMLAH": (cfg["count"], "count")}
+        agg.update({col: (col, "sum") for col in cfg["values"]})
+        df_agg = query.aggregate(nama, None, periode, ["status"], dropna=False, **agg).set_index("status").fillna(0)
+    else:
+        agg = {"JUMLAH": ("_terisi", "sum")}
+        agg.update({col: (col, "sum") for col in cfg["values"]})
+        df_agg = (df[["status"] + cfg["values"]]
+                  .assign(_terisi=df[cfg["count"]].notna())
+                  .groupby("status", dropna=False)
+                  .agg(**agg))
+
+    return KPI(
+        total=_ringkasan(df_agg, cfg["values"]),
+        disetujui=_ringkasan(df_agg[df_agg.index == 1], cfg["values"]),
+        ditolak=_ringkasan(df_agg[df_agg.index == 0], cfg["values"]),
+    )
@@ -0,0 +1,276 @@
+import copy
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import fitur
+import forest
+import timing
+from encoder import OneHotEncoder
+
+BASE_DIR = Path(__file__).resolve().parent
+
+logger = logging.getLogger(__name__)
+
+# ========== Daftar Model ==========
+MODELS = {
+    "ina_cbgs": {"file": "rf_pipeline_bpjs.pkl", "flat": True},
+    "non_cbgs": {"file": "logreg_model_noncbgs.pkl", "columns": "model_columns_noncbgs.pkl"},
+    "obat": {"file": "rf_obat.pkl", "flat": True},
+}
+
+# Forest di langkah terakhir pipeline dievaluasi lewat forest.py (array NumPy); KLAIM_FLAT_FOREST=0
+# kembali ke predict_proba sklearn
+FLAT_FOREST = os.environ.get("KLAIM_FLAT_FOREST", "1") == "1"
+
+# Skor minimal agar klaim dianggap berpotensi disetujui
+THRESHOLD = 0.8
+
+# Skor prediksi satu klaim disimpan per (model, versi, hash fitur); dipakai bersama semua sesi
+MAKS_PREDIKSI = 4096
+
+_warm_thread = None
+_warm_lock = threading.Lock()
+
+_prediksi = OrderedDict()
+_prediksi_versi = {}
+_prediksi_stats = {nama: {"hit": 0, "miss": 0} for nama in MODELS}
+_prediksi_lock = threading.Lock()
+
+
+def model_path(nama):
+    return BASE_DIR / MODELS[nama]["file"]
+
+
+def model_version(nama):
+    stat = model_path(nama).stat()
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+@st.cache_resource(show_spinner=False, max_entries=2 * len(MODELS))
+def _load(nama, versi):
+    cfg = MODELS[nama]
+    # Memori = selisih RSS proses selama unpickle (perkiraan: impor sklearn pada pemuatan pertama dan
+    # pemuatan lain yang berjalan bersamaan ikut terhitung). Tanpa /proc dipakai ukuran file .pkl
+    rss = timing._rss()
+    mulai = time.perf_counter()
+    model = joblib.load(model_path(nama))
+    columns = joblib.load(BASE_DIR / cfg["columns"]) if "columns" in cfg else None
+    durasi = time.perf_counter() - mulai
+    akhir = timing._rss()
+    if rss is not None and akhir is not None:
+        memori = max(akhir - rss, 0)
+    else:
+        memori = model_path(nama).stat().st_size + ((BASE_DIR / cfg["columns"]).stat().st_size if "columns" in cfg else 0)
+
+    logger.info("model %s dimuat dalam %.3f s (%.1f MB)", nama, durasi, memori / 1e6)
+    encoder, model_array, flat = None, None, None
+    if cfg.get("flat") and FLAT_FOREST:
+        try:
+            flat = forest.flatten(model)
+        except TypeError as e:
+            logger.warning("model %s tidak bisa diratakan, memakai predict_proba: %s", nama, e)
+    if columns is not None:
+        # Kolom kategori = kolom input yang tidak muncul apa adanya di model_columns (hanya sebagai dummy)
+        encoder = OneHotEncoder(columns, [c for c in fitur.KOLOM_INPUT[nama] if c not in columns])
+        nama_fitur = getattr(model, "feature_names_in_", None)
+        if nama_fitur is not None and list(nama_fitur) != list(columns):
+            raise ValueError(f"Urutan kolom {cfg['columns']} tidak sama dengan fitur model {cfg['file']}")
+        # Salinan dangkal tanpa feature_names_in_ untuk input array hasil encoder (urutan kolom sudah dicek)
+        model_array = copy.copy(model)
+        if nama_fitur is not None:
+            del model_array.feature_names_in_
+    return {
+        "model": model,
+        "columns": columns,
+        "encoder": encoder,
+        "model_array": model_array,
+        "flat": flat,
+        "versi": versi,
+        "load_s": durasi,
+        "memory_bytes": memori,
+    }
+
+
+def get_model(nama):
+    # Versi diambil dari mtime/ukuran file, jadi file .pkl yang diganti otomatis dimuat ulang
+    return _load(nama, model_version(nama))
+
+
+def predict_scores(nama, df):
+    entry = get_model(nama)
+    if entry["encoder"] is not None:
+        return entry["model_array"].predict_proba(entry["encoder"].transform(df))[:, 1]
+    if entry["flat"] is not None:
+        return entry["flat"].predict_proba(df)[:, 1]
+    return entry["model"].predict_proba(df)[:, 1]
+
+
+def _predict_one(nama, input_data):
+    # Satu input form: model dengan encoder langsung dari dict, tanpa DataFrame perantara
+    entry = get_model(nama)
+    if entry["encoder"] is not None:
+        return float(entry["model_array"].predict_proba(entry["encoder"].transform_one(input_data))[0, 1])
+    return float(predict_scores(nama, pd.DataFrame([input_data]))[0])
+
+
+def unknown_stats():
+    # Nilai kategori yang tidak dikenal encoder (dulu hilang diam-diam di reindex)
+    hasil = {}
+    for nama, cfg in MODELS.items():
+        if "columns" not in cfg:
+            continue
+        try:
+            hasil[nama] = get_model(nama)["encoder"].unknown_stats()
+        except Exception:
+            continue
+    return hasil
+
+
+# ========== Cache Prediksi ==========
+def _nilai(v):
+    # 1, 1.0 dan np.int64(1) menghasilkan kunci yang sama; NaN/None menjadi null
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return None if math.isnan(v) else float(v)
+    return v
+
+
+def feature_key(input_data):
+    # Hash kanonik vektor fitur (urutan kolom tetap, karena urutan itu yang dilihat model)
+    pasangan = [[str(col), _nilai(v)] for col, v in input_data.items()]
+    return hashlib.sha256(json.dumps(pasangan, default=str).encode()).hexdigest()
+
+
+def _simpan(key, score):
+    with _prediksi_lock:
+        _prediksi[key] = score
+        while len(_prediksi) > MAKS_PREDIKSI:
+            _prediksi.popitem(last=False)
+
+
+def _selesai(nilai):
+    fut = Future()
+    fut.set_result(nilai)
+    return fut
+
+
+def predict_score_async(nama, input_data):
+    # Future berisi skor satu klaim dari form Prediksi; input yang sama (mis. SEP dicek ulang)
+    # tidak diprediksi ulang. Dengan KLAIM_MICROBATCH=1 prediksi dijalankan worker inferensi.py
+    import inferensi
+
+    versi = model_version(nama)
+    key = (nama, versi, feature_key(input_data))
+    with _prediksi_lock:
+        if _prediksi_versi.get(nama) != versi:
+            # File model diganti: buang semua skor dari versi lama
+            for lama in [k for k in _prediksi if k[0] == nama]:
+                del _prediksi[lama]
+            _prediksi_versi[nama] = versi
+        if key in _prediksi:
+            _prediksi.move_to_end(key)
+            _prediksi_stats[nama]["hit"] += 1
+            return _selesai(_prediksi[key])
+        _prediksi_stats[nama]["miss"] += 1
+
+    if inferensi.AKTIF:
+        fut = inferensi.submit(nama, input_data)
+        fut.add_done_callback(lambda f: f.exception() is None and _simpan(key, f.result()))
+        return fut
+
+    score = _predict_one(nama, input_data)
+    _simpan(key, score)
+    return _selesai(score)
+
+
+def predict_score(nama, input_data):
+    return predict_score_async(nama, input_data).result()
+
+
+def cache_stats():
+    with _prediksi_lock:
+        hasil = {}
+        for nama, s in _prediksi_stats.items():
+            total = s["hit"] + s["miss"]
+            hasil[nama] = {**s, "hit_rate": s["hit"] / total if total else 0.0}
+        hasil["entries"] = len(_prediksi)
+        return hasil
+
+
+def panel():
+    # Ditampilkan bersama panel waktu proses (checkbox "Tampilkan Waktu Proses")
+    if not st.session_state.get("show_timing"):
+        return
+    s = cache_stats()
+    baris = [f"{nama}: {v['hit']} hit / {v['miss']} miss ({v['hit_rate']:.0%})" for nama, v in s.items() if nama in MODELS]
+    st.sidebar.markdown(f"**Cache prediksi** ({s['entries']} skor)  \n" + "  \n".join(baris))
+
+    for nama, per_kolom in unknown_stats().items():
+        baris = [
+            f"{kat}: {v['total']} ({', '.join(f'{nilai} {n}' for nilai, n in v['top'])})"
+            for kat, v in per_kolom.items() if v["total"]
+        ]
+        if baris:
+            st.sidebar.markdown(f"**Kategori tidak dikenal {nama}**  \n" + "  \n".join(baris))
+
+    import inferensi
+
+    if inferensi.AKTIF:
+        baris = [f"{nama}: {v['request']} permintaan, rata-rata batch {v['rata_batch']:.1f}" for nama, v in inferensi.stats().items()]
+        st.sidebar.markdown("**Micro-batch inferensi**  \n" + ("  \n".join(baris) or "belum ada permintaan"))
+
+
+def warm_up():
+    for nama in MODELS:
+        try:
+            get_model(nama)
+        except Exception as e:
+            logger.warning("model %s gagal dimuat: %s", nama, e)
+
+
+def warm_up_background():
+    # Pemanasan di thread terpisah: halaman pertama tidak menunggu impor sklearn + unpickle model
+    global _warm_thread
+    with _warm_lock:
+        if _warm_thread is None:
+            _warm_thread = threading.Thread(target=warm_up, name="model-warm-up", daemon=True)
+            _warm_thread.start()
+    return _warm_thread
+
+
+def report():
+    rows = []
+    for nama, cfg in MODELS.items():
+        try:
+            entry = get_model(nama)
+            rows.append({
+                "model": nama,
+                "file": cfg["file"],
+                "versi": entry["versi"],
+                "load_s": round(entry["load_s"], 3),
+                "memory_mb": round(entry["memory_bytes"] / 1e6, 2),
+                **({"flat": entry["flat"] is not None} if cfg.get("flat") else {}),
+                **({"unknown": entry["encoder"].unknown_stats()} if entry["encoder"] is not None else {}),
+            })
+        except Exception as e:
+            rows.append({"model": nama, "file": cfg["file"], "error": str(e)})
+    return rows
+
+
+if __name__ == "__main__":
+    for row in report():
+        print(row)
@@ -2,17 +2,24 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from streamlit_option_menu import option_menu
-from numerize.numerize import numerize
-import altair as alt
-import joblib
-import time
-from PIL import Image
-import base64
-from streamlit_extras.metric_cards import style_metric_cards
-from pycaret.regression import load_model, predict_model
-
-model = joblib.load('logreg_model_noncbgs.pkl')
-model_columns = joblib.load('model_columns_noncbgs.pkl')
+import aset
+import cube
+import grafik
+import impor
+import kpi
+import query
+import tabel
+import timing
+from data import bulan_mapping
+
+# Hanya dipakai menu Prediksi / Prediksi Batch; sklearn ikut dimuat saat model pertama dipakai
+batch = impor.lazy("batch")
+models = impor.lazy("models")
+icd = impor.lazy("icd")
+
+# Frame bersama (data.get_dataset) dipakai semua sesi; dengan copy-on-write, turunan (filter, kolom baru)
+# tidak pernah mengubah frame asli di cache. Diaktifkan di setiap skrip halaman, bukan saat data diimpor
+pd.set_option("mode.copy_on_write", True)
 
 st.set_page_config(page_title="Non-CBGs", page_icon="🩺", layout="wide")
 
@@ -20,42 +27,14 @@ st.markdown("""
     <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@400;600&display=swap" rel="stylesheet">  
 """, unsafe_allow_html=True)
 
-def add_bg_from_local(image_path):
-    with open(image_path, "rb") as image_file:
-        encoded_string = base64.b64encode(image_file.read()).decode()
+aset.add_bg('background.png')
 
-    st.markdown(
-        f"""
-        <style>
-        .stApp {{
-            background-image: url("data:image/png;base64,{encoded_string}");
-            background-size: cover;
-            background-attachment: fixed;
-            background-position: center;
-        }}
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
-
-add_bg_from_local('assets/background.png')  
+timing.start("non_cbgs")
 
 # ========== Tampilan Loading ==========
-with st.spinner("Memuat dashboard..."):
-    time.sleep(1.5)
-
-df = pd.read_excel('pengajuan_noncbgs_dengan_status.xlsx')  
-
-if 'tglmasuk' in df.columns:
-    df['tglmasuk'] = pd.to_datetime(df['tglmasuk'], format='%d/%m/%Y')
-    df['BULAN'] = df['tglmasuk'].dt.month
-    df['TAHUN'] = df['tglmasuk'].dt.year
-
-bulan_mapping = {
-    1: "Januari", 2: "Februari", 3: "Maret", 4: "April", 5: "Mei", 6: "Juni",
-    7: "Juli", 8: "Agustus", 9: "September", 10: "Oktober", 11: "November", 12: "Desember"
-}
-df['BULAN_NAMA'] = df['BULAN'].map(bulan_mapping)
+with st.spinner("Memuat dashboard..."), timing.stage("data load") as info:
+    df = query.load("non_cbgs")
+    info["rows_out"] = timing.rows(df)
 
 st.markdown("""
     <style>
@@ -141,11 +120,12 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Pilihan filter bulan dan tahun
+@timing.instrument("filter_df")
 def filter_df():
     st.sidebar.header("Filter Data")
 
     # Tahun
-    all_years = sorted(df['TAHUN'].unique(), reverse=True)
+    all_years = query.years("non_cbgs")
     tahun_options = ["All"] + all_years
     selected_years = st.sidebar.multiselect("Pilih Tahun", options=tahun_options, default=["All"])
 
@@ -160,17 +140,14 @@ def filter_df():
     if "All" in selected_months or not selected_months:
         selected_months = all_months
 
-    df_filtered = df.copy()
-    df_filtered = df_filtered[df_filtered['TAHUN'].isin(selected_years)]
-
     bulan_angka = {v: k for k, v in bulan_mapping.items()}
     selected_bulan_angka = [bulan_angka[bulan] for bulan in selected_months]
-    df_filtered = df_filtered[df_filtered['BULAN'].isin(selected_bulan_angka)]
+    df_filtered = query.filter_periode("non_cbgs", selected_years, selected_bulan_angka)
 
-    return df_filtered
+    return df_filtered, {"years": selected_years, "months": selected_bulan_angka}
 
 
-def non_cbgs(df_filtered):
+def non_cbgs(df_filtered, periode):
     st.markdown(
         """
         <div style="background-color:rgba(106, 156, 137, 0.5); padding:12px; border-radius:10px; text-align:center; margin-bottom: 20px;">
@@ -213,24 +190,22 @@ def non_cbgs(df_filtered):
 
     # Expander untuk tampilan data
     with st.expander("VIEW EXCEL DATASET"):
-        showData = st.multiselect(
-            'Filter: ',
-            df_filtered.columns,
-            default=["nosep", "jenis_klaim", "jnspelayanan", "tarifrs", "tagihan"]
-        )
-        st.dataframe(df_filtered[showData], use_container_width=True)
+        tabel.tampilkan("non_cbgs", df_filtered, periode,
+                        default=["nosep", "jenis_klaim", "jnspelayanan", "tarifrs", "tagihan"],
+                        key="filter_data")
 
-    total_klaim = df_filtered['nama'].apply(lambda x: isinstance(x, str)).sum() 
-    klaim_disetujui = df_filtered[df_filtered['status'] == 1]['nama'].count()  
-    klaim_ditolak = df_filtered[df_filtered['status'] == 0]['nama'].count()  
-    persentase_disetujui = (klaim_disetujui / total_klaim) * 100 if total_klaim else 0
-    persentase_ditolak = (klaim_ditolak / total_klaim) * 100 if total_klaim else 0
+    hasil = kpi.compute("non_cbgs", df_filtered, periode)
+    total_klaim = hasil.total.jumlah
+    klaim_disetujui = hasil.disetujui.jumlah
+    klaim_ditolak = hasil.ditolak.jumlah
+    persentase_disetujui = hasil.persen_disetujui
+    persentase_ditolak = hasil.persen_ditolak
 
     # Hitung total tarif RS dan tagihan
-    tarif_rs_disetujui = df_filtered[df_filtered['status'] == 1]['tarifrs'].sum()
-    tagihan_disetujui = df_filtered[df_filtered['status'] == 1]['tagihan'].sum()
-    tarif_rs_ditolak = df_filtered[df_filtered['status'] == 0]['tarifrs'].sum()
-    tagihan_ditolak = df_filtered[df_filtered['status'] == 0]['tagihan'].sum()
+    tarif_rs_disetujui = hasil.disetujui.sums['tarifrs']
+    tagihan_disetujui = hasil.disetujui.sums['tagihan']
+    tarif_rs_ditolak = hasil.ditolak.sums['tarifrs']
+    tagihan_ditolak = hasil.ditolak.sums['tagihan']
 
     total1, total2, total3 = st.columns(3, gap='small')
 
@@ -240,8 +215,8 @@ def non_cbgs(df_filtered):
             <div style="background-color:#D9F0E6; padding:12px; border-radius:10px; border: 1px solid #888; margin-bottom: 20px;">
                 <h4 style="margin:0 0 6px 0; color:black; text-align:center;">🔎 Total Pengajuan Klaim Non-CBGs</h4>
                 <p style="margin:0; font-size:20px; font-weight:bold;">Jumlah Klaim: <span style="color:#205781;">{total_klaim:,.0f} Klaim</span></p>
-                <p style="margin:0; font-size:20px; font-weight:bold;">Total Tarif RS: <span style="color:#205781;">Rp{df_filtered['tarifrs'].sum():,.0f}</span></p>
-                <p style="margin:0; font-size:20px; font-weight:bold;">Total Tagihan: <span style="color:#205781;">Rp{df_filtered['tagihan'].sum():,.0f}</span></p>
+                <p style="margin:0; font-size:20px; font-weight:bold;">Total Tarif RS: <span style="color:#205781;">Rp{hasil.total.sums['tarifrs']:,.0f}</span></p>
+                <p style="margin:0; font-size:20px; font-weight:bold;">Total Tagihan: <span style="color:#205781;">Rp{hasil.total.sums['tagihan']:,.0f}</span></p>
             </div>
             """,
             unsafe_allow_html=True
@@ -276,7 +251,7 @@ def non_cbgs(df_filtered):
 def format_rupiah(val):
     return "Rp " + f"{val:,.0f}".replace(",", ".")
 
-def graphs(df_filtered): 
+def graphs(df_cube, periode): 
     st.markdown(
         """
         <div style="
@@ -295,61 +270,61 @@ def graphs(df_filtered):
         unsafe_allow_html=True
     )
 
-    df_agg = df_filtered.groupby(['TAHUN', 'BULAN', 'BULAN_NAMA']).agg({
-        'tagihan': 'sum',
-        'tarifrs': 'sum'
-    }).reset_index().sort_values(['TAHUN', 'BULAN'])
-
-    df_plot = pd.DataFrame({
-        'Bulan': df_agg['BULAN_NAMA'].tolist() * 2,
-        'Nilai': df_agg['tagihan'].tolist() + df_agg['tarifrs'].tolist(),
-        'Kategori': ['Total Tagihan']*len(df_agg) + ['Tarif RS']*len(df_agg)
-    })
-
-    df_plot['Label_Rp'] = df_plot['Nilai'].apply(format_rupiah)
-
-    fig = px.line(
-        df_plot,
-        x='Bulan',
-        y='Nilai',
-        color='Kategori',
-        color_discrete_map={'Total Tagihan': 'blue', 'Tarif RS': 'orange'},
-        markers=True,
-        text='Label_Rp'
-    )
+    def buat():
+        df_agg = df_cube
+
+        df_plot = pd.DataFrame({
+            'Bulan': df_agg['BULAN_NAMA'].tolist() * 2,
+            'Nilai': df_agg['tagihan'].tolist() + df_agg['tarifrs'].tolist(),
+            'Kategori': ['Total Tagihan']*len(df_agg) + ['Tarif RS']*len(df_agg)
+        })
+
+        df_plot['Label_Rp'] = df_plot['Nilai'].apply(format_rupiah)
+
+        fig = px.line(
+            df_plot,
+            x='Bulan',
+            y='Nilai',
+            color='Kategori',
+            color_discrete_map={'Total Tagihan': 'blue', 'Tarif RS': 'orange'},
+            markers=True,
+            text='Label_Rp'
+        )
 
-    fig.update_traces(line=dict(width=4))
+        fig.update_traces(line=dict(width=4))
 
-    y_max = df_plot['Nilai'].max()
-    max_ticks = 6  
-    nice_interval = round(y_max / max_ticks / 100000) * 100000  
-    y_ticks = list(range(0, int(y_max + nice_interval), int(nice_interval)))
-    y_labels = [format_rupiah(val) for val in y_ticks]
+        y_max = df_plot['Nilai'].max()
+        max_ticks = 6  
+        nice_interval = round(y_max / max_ticks / 100000) * 100000  
+        y_ticks = list(range(0, int(y_max + nice_interval), int(nice_interval)))
+        y_labels = [format_rupiah(val) for val in y_ticks]
 
-    fig.update_traces(
-        textposition="top center",
-        textfont=dict(size=14, color='black'),
-        texttemplate="%{text}"
-    )
+        fig.update_traces(
+            textposition="top center",
+            textfont=dict(size=14, color='black'),
+            texttemplate="%{text}"
+        )
 
-    fig.update_layout(
-        xaxis_title=dict(text='Bulan', font=dict(color='black', size=18)),
-        yaxis_title=dict(text='Total Klaim', font=dict(color='black', size=18)),
-        xaxis=dict(tickfont=dict(color='black', size=16)),
-        yaxis=dict(
-            tickfont=dict(color='black', size=16),
-            tickvals=y_ticks,
-            ticktext=y_labels
-        ),
-        margin=dict(t=40, b=40),
-        height=500,
-        legend=dict(font=dict(size=14, color='black')),
-        legend_title=dict(font=dict(size=14, color='black'))
-    )
+        fig.update_layout(
+            xaxis_title=dict(text='Bulan', font=dict(color='black', size=18)),
+            yaxis_title=dict(text='Total Klaim', font=dict(color='black', size=18)),
+            xaxis=dict(tickfont=dict(color='black', size=16)),
+            yaxis=dict(
+                tickfont=dict(color='black', size=16),
+                tickvals=y_ticks,
+                ticktext=y_labels
+            ),
+            margin=dict(t=40, b=40),
+            height=500,
+            legend=dict(font=dict(size=14, color='black')),
+            legend_title=dict(font=dict(size=14, color='black'))
+        )
 
-    st.plotly_chart(fig, use_container_width=True)
+        return fig
 
-def barchart(df_filtered):
+    st.plotly_chart(grafik.figure("non_cbgs", "graphs", periode, buat), use_container_width=True)
+
+def barchart(df_filtered, periode):
     st.markdown(
         """
         <div style="
@@ -368,39 +343,42 @@ def barchart(df_filtered):
         unsafe_allow_html=True
     )
 
-    if 'jnspelayanan' in df_filtered.columns:
-        df_grouped = df_filtered.groupby('jnspelayanan', as_index=False).size()
-
-        fig = px.bar(
-            df_grouped,
-            x='jnspelayanan',
-            y='size',
-            color='jnspelayanan',  
-            color_discrete_map={'RAWAT INAP': 'blue', 'RAWAT JALAN': 'orange'},
-            labels={'size': 'Total Klaim', 'jnspelayanan': 'Jenis Pelayanan'},
-            text_auto=True
-        )
+    if 'jnspelayanan' in query.columns("non_cbgs", df_filtered):
+        def buat():
+            df_grouped = query.aggregate("non_cbgs", df_filtered, periode, ['jnspelayanan'], size=('jnspelayanan', 'size'))
+
+            fig = px.bar(
+                df_grouped,
+                x='jnspelayanan',
+                y='size',
+                color='jnspelayanan',  
+                color_discrete_map={'RAWAT INAP': 'blue', 'RAWAT JALAN': 'orange'},
+                labels={'size': 'Total Klaim', 'jnspelayanan': 'Jenis Pelayanan'},
+                text_auto=True
+            )
         
-        fig.update_layout(
-            xaxis_title=dict(text='Jenis Pelayanan', font=dict(color='black', size=18)),
-            yaxis_title=dict(text='Total Klaim', font=dict(color='black', size=18)),
-            xaxis=dict(tickfont=dict(color='black', size=16)),
-            yaxis=dict(tickfont=dict(color='black', size=16)),
-            legend=dict(font=dict(size=14, color='black')),
-            legend_title=dict(font=dict(size=14, color='black'))
-        )
+            fig.update_layout(
+                xaxis_title=dict(text='Jenis Pelayanan', font=dict(color='black', size=18)),
+                yaxis_title=dict(text='Total Klaim', font=dict(color='black', size=18)),
+                xaxis=dict(tickfont=dict(color='black', size=16)),
+                yaxis=dict(tickfont=dict(color='black', size=16)),
+                legend=dict(font=dict(size=14, color='black')),
+                legend_title=dict(font=dict(size=14, color='black'))
+            )
         
-        fig.update_traces(
-            textfont=dict(color='black', size=14),
-            textangle=0,
-            textposition='outside'
-        )
+            fig.update_traces(
+                textfont=dict(color='black', size=14),
+                textangle=0,
+                textposition='outside'
+            )
         
-        st.plotly_chart(fig, use_container_width=True)
+            return fig
+
+        st.plotly_chart(grafik.figure("non_cbgs", "barchart", periode, buat), use_container_width=True)
     else:
         st.warning("Kolom 'jnspelayanan' tidak ditemukan dalam data.")
         
-def treemap_diagnosis(df_filtered):
+def treemap_diagnosis(df_filtered, periode):
     st.markdown(
         """
         <div style="
@@ -419,41 +397,41 @@ def treemap_diagnosis(df_filtered):
         unsafe_allow_html=True
     )
 
-    if 'diagnosa' in df_filtered.columns and 'tarifrs' in df_filtered.columns:
-        df_grouped = df_filtered.groupby('diagnosa', as_index=False)['tarifrs'].sum()
-        df_grouped = df_grouped.sort_values(by='tarifrs', ascending=False)
-
-        df_grouped['Label_Rp'] = df_grouped['tarifrs'].apply(format_rupiah)
-
-        fig = px.treemap(
-            df_grouped,
-            path=['diagnosa'],
-            values='tarifrs',
-            color='tarifrs',
-            color_continuous_scale='YlOrRd',
-            hover_data={'tarifrs': True, 'diagnosa': True}
-        )
+    if {'diagnosa', 'tarifrs'} <= set(query.columns("non_cbgs", df_filtered)):
+        def buat():
+            df_grouped = query.aggregate("non_cbgs", df_filtered, periode, ['diagnosa'], tarifrs=('tarifrs', 'sum'))
+            df_grouped = df_grouped.sort_values(by='tarifrs', ascending=False)
+
+            df_grouped['Label_Rp'] = df_grouped['tarifrs'].apply(format_rupiah)
+
+            fig = px.treemap(
+                df_grouped,
+                path=['diagnosa'],
+                values='tarifrs',
+                color='tarifrs',
+                color_continuous_scale='YlOrRd',
+                hover_data={'tarifrs': True, 'diagnosa': True}
+            )
         
-        fig.update_traces(
-            texttemplate="<b>%{label}</b><br>Rp %{value:,.0f}",
-            textfont=dict(size=18)
-        )
+            fig.update_traces(
+                texttemplate="<b>%{label}</b><br>Rp %{value:,.0f}",
+                textfont=dict(size=18)
+            )
 
-        fig.update_layout(
-            margin=dict(t=30, l=10, r=10, b=10),
-            coloraxis_colorbar=dict(title='Tarif RS', tickformat=',.0f')
-        )
+            fig.update_layout(
+                margin=dict(t=30, l=10, r=10, b=10),
+                coloraxis_colorbar=dict(title='Tarif RS', tickformat=',.0f')
+            )
 
-        st.plotly_chart(fig, use_container_width=True)
+            return fig
+
+        st.plotly_chart(grafik.figure("non_cbgs", "treemap_diagnosis", periode, buat), use_container_width=True)
     else:
         st.warning("Kolom 'diagnosa' atau 'tarifrs' tidak ditemukan.")
         
+@timing.instrument("predict_status")
 def predict_status(input_data):
-    df = pd.DataFrame([input_data])
-    df_encoded = pd.get_dummies(df)
-    df_encoded = df_encoded.reindex(columns=model_columns, fill_value=0)
-    score = model.predict_proba(df_encoded)[0][1]
-    return score
+    return models.predict_score("non_cbgs", input_data)
         
 def prediksi():
     st.markdown('<h2 class="title">PREDIKSI PENGKLAIMAN Non-CBGs</h2>', unsafe_allow_html=True)
@@ -464,9 +442,6 @@ def prediksi():
         - Tekan tombol 'Prediksi' untuk melihat hasil prediksi.
     """)
     st.sidebar.markdown("---")
-    
-    diagnosa_df = pd.read_csv("ICD-10 e-klaim.csv")  
-    diagnosa_dict = dict(zip(diagnosa_df['DISPLAY'], diagnosa_df['CODE']))  
 
     st.markdown("""
         <style>
@@ -495,9 +470,13 @@ def prediksi():
         </style>
     """, unsafe_allow_html=True)
 
+    st.subheader("Masukkan Data Pengajuan Klaim Non-CBGS")
+
+    # Diagnosa di luar form agar pencarian kode langsung berjalan saat mengetik
+    diagnosa_code = ";".join(icd.pilih_kode("Diagnosa", "icd10", key="diagnosa"))
+
     # --- Input Form ---
     with st.form("form_prediksi"):
-        st.subheader("Masukkan Data Pengajuan Klaim Non-CBGS")
         jns_pelayanan = st.selectbox("Jenis Pelayanan", ["Rawat Jalan", "Rawat Inap"], help="Pilih Jenis Pelayanan.")
         jns_klaim = st.selectbox("Jenis Klaim", [
             'KANTONG DARAH', 'PENYANGGA LEHER/COLLAR NECK (ALKES)',
@@ -506,9 +485,6 @@ def prediksi():
             'PENYANGGA LEHER (ALKES)', 'ALTEPLASE', 'TONGKAT',
             'CERVICAL COLLAR'], help="Pilih Jenis Klaim")
 
-        diagnosa_display = st.multiselect("Diagnosa", list(diagnosa_dict.keys()), help="Pilih Diagnosa")
-        diagnosa_code = ";".join([diagnosa_dict[d] for d in diagnosa_display])
-        
         jumlah = st.number_input("Jumlah", value=0, help="Masukkan jumlah unit yang akan diklaim.")
         tarifrs = st.number_input("Tarif Rumah Sakit", value=0, help="Masukkan Tarif Rumah Sakit")
         tagihan = st.number_input("Biaya Tagihan", value=0, help="Masukkan Jumlah Biaya Tagihan")
@@ -542,7 +518,7 @@ def prediksi():
             if score is None:
                 st.error("Tidak dapat melakukan prediksi")
                 return
-            prediction = 1 if score >= 0.8 else 0
+            prediction = 1 if score >= models.THRESHOLD else 0
             
             st.markdown("<h3>🧠 Hasil Prediksi</h3>", unsafe_allow_html=True)
             if prediction == 1:
@@ -564,8 +540,8 @@ def sideBar():
     with st.sidebar:
         selected = option_menu(
             menu_title="Menu", 
-            options=["Dashboard", "Prediksi"],
-            icons=["bar-chart", "activity"],
+            options=["Dashboard", "Prediksi", "Prediksi Batch"],
+            icons=["bar-chart", "activity", "upload"],
             menu_icon="cast",  
             default_index=0,
             orientation="vertical",
@@ -581,15 +557,28 @@ def sideBar():
 selected = sideBar()
     
 if selected == "Dashboard":
-    df_filtered = filter_df()  
-    non_cbgs(df_filtered)
-    graphs(df_filtered)
-    barchart(df_filtered)
-    treemap_diagnosis(df_filtered)
+    with timing.stage("filter"):
+        df_filtered, periode = filter_df()
+    with timing.stage("non_cbgs"):
+        non_cbgs(df_filtered, periode)
+    with timing.stage("graphs"):
+        graphs(cube.query("non_cbgs", **periode), periode)
+    with timing.stage("barchart"):
+        barchart(df_filtered, periode)
+    with timing.stage("treemap_diagnosis"):
+        treemap_diagnosis(df_filtered, periode)
     
 elif selected == "Prediksi":
-    prediksi()
+    with timing.stage("prediksi"):
+        prediksi()
+    models.panel()
+elif selected == "Prediksi Batch":
+    with timing.stage("prediksi batch"):
+        batch.prediksi_batch("non_cbgs", "Non-CBGs")
     
+timing.panel()
+grafik.panel()
+
 with st.sidebar:       
     st.sidebar.markdown("## 👨‍💻 Pengembang")
     st.sidebar.markdown("""
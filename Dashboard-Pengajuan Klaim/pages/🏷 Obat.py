@@ -2,16 +2,23 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from streamlit_option_menu import option_menu
-from numerize.numerize import numerize
-import altair as alt
-import joblib
-import time
-from PIL import Image
-import base64
-from streamlit_extras.metric_cards import style_metric_cards
-from pycaret.regression import load_model, predict_model
-
-model = joblib.load('rf_obat.pkl')
+import aset
+import cube
+import grafik
+import impor
+import kpi
+import query
+import tabel
+import timing
+from data import bulan_mapping
+
+# Hanya dipakai menu Prediksi / Prediksi Batch; sklearn ikut dimuat saat model pertama dipakai
+batch = impor.lazy("batch")
+models = impor.lazy("models")
+
+# Frame bersama (data.get_dataset) dipakai semua sesi; dengan copy-on-write, turunan (filter, kolom baru)
+# tidak pernah mengubah frame asli di cache. Diaktifkan di setiap skrip halaman, bukan saat data diimpor
+pd.set_option("mode.copy_on_write", True)
 
 st.set_page_config(page_title="Obat", page_icon="💊", layout="wide")
 
@@ -19,48 +26,21 @@ st.markdown("""
     <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@400;600&display=swap" rel="stylesheet">  
 """, unsafe_allow_html=True)
 
-def add_bg_from_local(image_path):
-    with open(image_path, "rb") as image_file:
-        encoded_string = base64.b64encode(image_file.read()).decode()
-
-    st.markdown(
-        f"""
-        <style>
-        .stApp {{
-            background-image: url("data:image/png;base64,{encoded_string}");
-            background-size: cover;
-            background-attachment: fixed;
-            background-position: center;
-        }}
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
+aset.add_bg('background.png')
 
-add_bg_from_local('assets/background.png')  
+timing.start("obat")
 
 # ========== Tampilan Loading ==========
-with st.spinner("Memuat dashboard..."):
-    time.sleep(1.5)
-
-df = pd.read_excel('pengajuan_obat_dengan_status.xlsx')  
-
-if 'TGL_RESEP' in df.columns:
-    df['TGL_RESEP'] = pd.to_datetime(df['TGL_RESEP'], format='%d/%m/%Y')
-    df['BULAN'] = df['TGL_RESEP'].dt.month
-    df['TAHUN'] = df['TGL_RESEP'].dt.year
-
-bulan_mapping = {
-    1: "Januari", 2: "Februari", 3: "Maret", 4: "April", 5: "Mei", 6: "Juni",
-    7: "Juli", 8: "Agustus", 9: "September", 10: "Oktober", 11: "November", 12: "Desember"
-}
-df['BULAN_NAMA'] = df['BULAN'].map(bulan_mapping)
+with st.spinner("Memuat dashboard..."), timing.stage("data load") as info:
+    df = query.load("obat")
+    info["rows_out"] = timing.rows(df)
 
+@timing.instrument("filter_df")
 def filter_df():
     st.sidebar.header("Filter Data")
 
     # Tahun
-    all_years = sorted(df['TAHUN'].unique(), reverse=True)
+    all_years = query.years("obat")
     tahun_options = ["All"] + all_years
     selected_years = st.sidebar.multiselect("Pilih Tahun", options=tahun_options, default=["All"])
 
@@ -75,15 +55,11 @@ def filter_df():
     if "All" in selected_months or not selected_months:
         selected_months = all_months
 
-    df_filtered = df.copy()
-
-    df_filtered = df_filtered[df_filtered['TAHUN'].isin(selected_years)]
-
     bulan_angka = {v: k for k, v in bulan_mapping.items()}
     selected_bulan_angka = [bulan_angka[bulan] for bulan in selected_months]
-    df_filtered = df_filtered[df_filtered['BULAN'].isin(selected_bulan_angka)]
+    df_filtered = query.filter_periode("obat", selected_years, selected_bulan_angka)
 
-    return df_filtered
+    return df_filtered, {"years": selected_years, "months": selected_bulan_angka}
 
 st.markdown("""
     <style>
@@ -151,7 +127,7 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-def obat(df_filtered):
+def obat(df_filtered, periode):
     st.markdown(
     """
     <div style="background-color:rgba(106, 156, 137, 0.5);; padding:12px; border-radius:10px; text-align:center; margin-bottom: 20px;">
@@ -162,23 +138,21 @@ def obat(df_filtered):
     """, unsafe_allow_html=True
 )
     with st.expander("VIEW EXCEL DATASET"):
-        showData = st.multiselect(
-            'Filter: ',
-            df_filtered.columns,
-            default=["SEP_KUNJUNGAN", "jenisresep", "obat", "jmlobat", "BIAYA_TAGIHAN", "biayasetuju"]
-        )        
-        st.dataframe(df_filtered[showData],use_container_width=True) 
-
-    total_klaim = df_filtered['status'].count() 
-    klaim_disetujui = df_filtered[df_filtered['status'] == 1]['status'].count()  
-    klaim_ditolak = df_filtered[df_filtered['status'] == 0]['status'].count()  
-    persentase_disetujui = (klaim_disetujui / total_klaim) * 100 if total_klaim else 0
-    persentase_ditolak = (klaim_ditolak / total_klaim) * 100 if total_klaim else 0
-
-    biayasetuju_disetujui = df_filtered[df_filtered['status'] == 1]['biayasetuju'].sum()
-    tagihan_disetujui = df_filtered[df_filtered['status'] == 1]['BIAYA_TAGIHAN'].sum()
-    biayasetuju_ditolak = df_filtered[df_filtered['status'] == 0]['biayasetuju'].sum()
-    tagihan_ditolak = df_filtered[df_filtered['status'] == 0]['BIAYA_TAGIHAN'].sum()
+        tabel.tampilkan("obat", df_filtered, periode,
+                        default=["SEP_KUNJUNGAN", "jenisresep", "obat", "jmlobat", "BIAYA_TAGIHAN", "biayasetuju"],
+                        key="filter_data")
+
+    hasil = kpi.compute("obat", df_filtered, periode)
+    total_klaim = hasil.total.jumlah
+    klaim_disetujui = hasil.disetujui.jumlah
+    klaim_ditolak = hasil.ditolak.jumlah
+    persentase_disetujui = hasil.persen_disetujui
+    persentase_ditolak = hasil.persen_ditolak
+
+    biayasetuju_disetujui = hasil.disetujui.sums['biayasetuju']
+    tagihan_disetujui = hasil.disetujui.sums['BIAYA_TAGIHAN']
+    biayasetuju_ditolak = hasil.ditolak.sums['biayasetuju']
+    tagihan_ditolak = hasil.ditolak.sums['BIAYA_TAGIHAN']
 
     total1, total2, total3 = st.columns(3, gap='small')
 
@@ -188,8 +162,8 @@ def obat(df_filtered):
             <div style="background-color:#D9F0E6; padding:12px; border-radius:10px; border: 1px solid #888; margin-bottom: 20px;">
                 <h4 style="margin:0 0 6px 0; color:black; text-align:center;">🔎 Total Pengajuan Klaim Obat</h4>
                 <p style="margin:0; font-size:20px; font-weight:bold;">Jumlah Klaim: <span style="color:#205781;">{total_klaim:,.0f} Klaim</span></p>
-                <p style="margin:0; font-size:20px; font-weight:bold;">Total Tarif RS: <span style="color:#205781;">Rp{df_filtered['biayasetuju'].sum():,.0f}</span></p>
-                <p style="margin:0; font-size:20px; font-weight:bold;">Total Tagihan: <span style="color:#205781;">Rp{df_filtered['BIAYA_TAGIHAN'].sum():,.0f}</span></p>
+                <p style="margin:0; font-size:20px; font-weight:bold;">Total Tarif RS: <span style="color:#205781;">Rp{hasil.total.sums['biayasetuju']:,.0f}</span></p>
+                <p style="margin:0; font-size:20px; font-weight:bold;">Total Tagihan: <span style="color:#205781;">Rp{hasil.total.sums['BIAYA_TAGIHAN']:,.0f}</span></p>
             </div>
             """,
             unsafe_allow_html=True
@@ -221,17 +195,7 @@ def obat(df_filtered):
             unsafe_allow_html=True
         )
         
-def obat_chart(df_filtered, line_width=4):
-    df_filtered['TAHUN_BULAN'] = df_filtered['TAHUN'].astype(str) + " " + df_filtered['BULAN_NAMA']
-    df_filtered['TAHUN_BULAN_ORDER'] = df_filtered['TAHUN'] * 100 + df_filtered['BULAN']
-
-    df_agg = df_filtered.groupby(["TAHUN_BULAN", "TAHUN_BULAN_ORDER"])['jmlobat'].count().reset_index()
-    df_agg = df_agg.sort_values(by=["TAHUN_BULAN_ORDER"], ascending=True)
-    category_order = df_agg["TAHUN_BULAN"].tolist()
-
-    # Tambahkan kolom label
-    df_agg['LABEL'] = df_agg['jmlobat'].apply(lambda x: f"{x:,}")
-
+def obat_chart(df_cube, periode, line_width=4):
     st.markdown(
         """
         <div style="
@@ -249,34 +213,44 @@ def obat_chart(df_filtered, line_width=4):
         unsafe_allow_html=True
     )
 
-    fig = px.line(df_agg, 
-                  x="TAHUN_BULAN", 
-                  y="jmlobat", 
-                  markers=True,
-                  labels={"jmlobat": "Jumlah Obat", "TAHUN_BULAN": "Bulan-Tahun"},
-                  template="plotly_white",
-                  category_orders={"TAHUN_BULAN": category_order},
-                  text='LABEL')  
-
-    fig.update_traces(line=dict(width=line_width), textposition='top center', textfont=dict(color='black', size=14))
-
-    fig.update_xaxes(
-        type="category", 
-        tickangle=-45,
-        title_text="Bulan-Tahun",
-        title_font=dict(color='black', size=18),
-        tickfont=dict(color='black', size=16)
-    )
+    def buat(line_width):
+        # Cube sudah terurut per PERIODE
+        category_order = df_cube["TAHUN_BULAN"].tolist()
+
+        # Tambahkan kolom label
+        df_agg = df_cube.rename(columns={'JUMLAH': 'jmlobat'})
+        df_agg = df_agg.assign(LABEL=df_agg['jmlobat'].map(lambda x: f"{x:,}"))
+
+        fig = px.line(df_agg, 
+                      x="TAHUN_BULAN", 
+                      y="jmlobat", 
+                      markers=True,
+                      labels={"jmlobat": "Jumlah Obat", "TAHUN_BULAN": "Bulan-Tahun"},
+                      template="plotly_white",
+                      category_orders={"TAHUN_BULAN": category_order},
+                      text='LABEL')  
+
+        fig.update_traces(line=dict(width=line_width), textposition='top center', textfont=dict(color='black', size=14))
+
+        fig.update_xaxes(
+            type="category", 
+            tickangle=-45,
+            title_text="Bulan-Tahun",
+            title_font=dict(color='black', size=18),
+            tickfont=dict(color='black', size=16)
+        )
     
-    fig.update_yaxes(
-        tickformat=',.0f',
-        title_text="Jumlah Obat",
-        title_font=dict(color='black', size=18),
-        tickfont=dict(color='black', size=16)
-    )
+        fig.update_yaxes(
+            tickformat=',.0f',
+            title_text="Jumlah Obat",
+            title_font=dict(color='black', size=18),
+            tickfont=dict(color='black', size=16)
+        )
     
-    fig.update_layout(legend=dict(font=dict(size=12, color='black')))
-    st.plotly_chart(fig, use_container_width=True)
+        fig.update_layout(legend=dict(font=dict(size=12, color='black')))
+        return fig
+
+    st.plotly_chart(grafik.figure("obat", "obat_chart", periode, buat, line_width=line_width), use_container_width=True)
     
 def format_rupiah(value):
     if value >= 1_000_000_000:
@@ -288,29 +262,7 @@ def format_rupiah(value):
     else:
         return f"Rp {value}"
 
-def biaya_per_obat_chart(df_filtered, top_n=10):
-    agg = (df_filtered
-           .groupby('obat', as_index=False)
-           .agg({'BIAYA_TAGIHAN': 'sum', 'biayasetuju': 'sum'}))
-
-    agg = agg.sort_values('BIAYA_TAGIHAN', ascending=False)
-
-    if len(agg) > top_n:
-        top = agg.head(top_n)
-        others = pd.DataFrame({
-            'obat': ['Lainnya'],
-            'BIAYA_TAGIHAN': [agg['BIAYA_TAGIHAN'][top_n:].sum()],
-            'biayasetuju': [agg['biayasetuju'][top_n:].sum()]
-        })
-        agg = pd.concat([top, others], ignore_index=True)
-
-    agg_melt = agg.melt(id_vars='obat',
-                        value_vars=['BIAYA_TAGIHAN', 'biayasetuju'],
-                        var_name='Kategori',
-                        value_name='Total')
-
-    agg_melt['Label'] = agg_melt['Total'].apply(format_rupiah)
-
+def biaya_per_obat_chart(df_filtered, periode, top_n=10):
     st.markdown("""
         <div style="
             background-color:#A6CDC6;
@@ -324,39 +276,63 @@ def biaya_per_obat_chart(df_filtered, top_n=10):
             Biaya Tagihan vs Biaya Disetujui per Jenis Obat
         </div>""", unsafe_allow_html=True)
 
-    fig = px.bar(agg_melt,
-                 x='obat',
-                 y='Total',
-                 color='Kategori',
-                 barmode='group',
-                 text='Label',
-                 color_discrete_map={
-                     'BIAYA_TAGIHAN': '#FF4B4B',
-                     'biayasetuju'  : '#00CC96'
-                 },
-                 labels={'obat': 'Nama Obat',
-                         'Total': 'Total Biaya (Rp)',
-                         'Kategori': 'Kategori'})
-
-    fig.update_layout(
-        plot_bgcolor='white',
-        xaxis_title=dict(text='Nama Obat', font=dict(color='black', size=18)),
-        yaxis_title=dict(text='Total Biaya (Rp)', font=dict(color='black', size=18)),
-        xaxis_tickangle=-45,
-        xaxis_tickfont=dict(color='black', size=14),
-        yaxis_tickformat=',',
-        yaxis_tickfont=dict(color='black', size=14),
-        legend=dict(font=dict(size=12, color='black')),
-        height=550
-    )
+    def buat(top_n):
+        agg = query.aggregate("obat", df_filtered, periode, ['obat'],
+                              BIAYA_TAGIHAN=('BIAYA_TAGIHAN', 'sum'),
+                              biayasetuju=('biayasetuju', 'sum'))
+
+        agg = agg.sort_values('BIAYA_TAGIHAN', ascending=False)
+
+        if len(agg) > top_n:
+            top = agg.head(top_n)
+            others = pd.DataFrame({
+                'obat': ['Lainnya'],
+                'BIAYA_TAGIHAN': [agg['BIAYA_TAGIHAN'][top_n:].sum()],
+                'biayasetuju': [agg['biayasetuju'][top_n:].sum()]
+            })
+            agg = pd.concat([top, others], ignore_index=True)
+
+        agg_melt = agg.melt(id_vars='obat',
+                            value_vars=['BIAYA_TAGIHAN', 'biayasetuju'],
+                            var_name='Kategori',
+                            value_name='Total')
+
+        agg_melt['Label'] = agg_melt['Total'].apply(format_rupiah)
+
+        fig = px.bar(agg_melt,
+                     x='obat',
+                     y='Total',
+                     color='Kategori',
+                     barmode='group',
+                     text='Label',
+                     color_discrete_map={
+                         'BIAYA_TAGIHAN': '#FF4B4B',
+                         'biayasetuju'  : '#00CC96'
+                     },
+                     labels={'obat': 'Nama Obat',
+                             'Total': 'Total Biaya (Rp)',
+                             'Kategori': 'Kategori'})
+
+        fig.update_layout(
+            plot_bgcolor='white',
+            xaxis_title=dict(text='Nama Obat', font=dict(color='black', size=18)),
+            yaxis_title=dict(text='Total Biaya (Rp)', font=dict(color='black', size=18)),
+            xaxis_tickangle=-45,
+            xaxis_tickfont=dict(color='black', size=14),
+            yaxis_tickformat=',',
+            yaxis_tickfont=dict(color='black', size=14),
+            legend=dict(font=dict(size=12, color='black')),
+            height=550
+        )
+
+        fig.update_traces(textposition='outside', textfont=dict(size=12, color='black'))
+        return fig
 
-    fig.update_traces(textposition='outside', textfont=dict(size=12, color='black'))
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(grafik.figure("obat", "biaya_per_obat_chart", periode, buat, top_n=top_n), use_container_width=True)
 
+@timing.instrument("predict_status")
 def predict_status(input_data):
-    df = pd.DataFrame([input_data])
-    score = model.predict_proba(df)[0][1]
-    return score
+    return models.predict_score("obat", input_data)
     
 def prediksi():
     st.markdown('<h2 class="title">PREDIKSI PENGKLAIMAN OBAT</h2>', unsafe_allow_html=True)
@@ -451,7 +427,7 @@ def prediksi():
                 st.error("Tidak dapat melakukan prediksi")
                 return
 
-            prediction = 1 if score >= 0.8 else 0
+            prediction = 1 if score >= models.THRESHOLD else 0
 
             st.markdown("<h3>🧠 Hasil Prediksi</h3>", unsafe_allow_html=True)
             if prediction == 1:
@@ -473,8 +449,8 @@ def sideBar():
     with st.sidebar:
         selected = option_menu(
             menu_title="Menu", 
-            options=["Dashboard", "Prediksi"],
-            icons=["bar-chart", "activity"],
+            options=["Dashboard", "Prediksi", "Prediksi Batch"],
+            icons=["bar-chart", "activity", "upload"],
             menu_icon="cast",  
             default_index=0,
             orientation="vertical",
@@ -490,14 +466,26 @@ def sideBar():
 selected = sideBar()
 
 if selected == "Dashboard":
-    df_filtered = filter_df()  
-    obat(df_filtered)
-    obat_chart(df_filtered)
-    biaya_per_obat_chart(df_filtered, top_n=10)
+    with timing.stage("filter"):
+        df_filtered, periode = filter_df()
+    with timing.stage("obat"):
+        obat(df_filtered, periode)
+    with timing.stage("obat_chart"):
+        obat_chart(cube.query("obat", **periode), periode)
+    with timing.stage("biaya_per_obat_chart"):
+        biaya_per_obat_chart(df_filtered, periode, top_n=10)
     
 elif selected == "Prediksi":
-    prediksi()
+    with timing.stage("prediksi"):
+        prediksi()
+    models.panel()
+elif selected == "Prediksi Batch":
+    with timing.stage("prediksi batch"):
+        batch.prediksi_batch("obat", "OBAT")
     
+timing.panel()
+grafik.panel()
+
 with st.sidebar:       
     st.sidebar.markdown("## 👨‍💻 Pengembang")
     st.sidebar.markdown("""
@@ -0,0 +1,64 @@
+import os
+
+import data
+
+# ========== Backend Data ==========
+# "pandas" (bawaan): frame di memori per proses. "sqlite"/"duckdb": tabel di file basis data tertanam,
+# filter dan agregasi dijalankan di sana sehingga riwayat tidak perlu muat di RAM
+BACKEND = os.environ.get("KLAIM_BACKEND", "pandas").lower()
+BACKENDS = ("pandas", "sqlite", "duckdb")
+if BACKEND not in BACKENDS:
+    raise ValueError(f"KLAIM_BACKEND tidak dikenal: {BACKEND} (pilih {', '.join(BACKENDS)})")
+
+
+def uses_sql():
+    return BACKEND != "pandas"
+
+
+def _sql():
+    import sql
+
+    return sql
+
+
+def load(nama):
+    # Dipanggil saat halaman dibuka; backend SQL hanya menyinkronkan tabel, tidak memuat frame
+    if uses_sql():
+        _sql().sync(BACKEND, nama)
+        return None
+    return data.get_dataset(nama)
+
+
+def years(nama):
+    if uses_sql():
+        return _sql().years(BACKEND, nama)
+    return data.get_years(nama)
+
+
+def filter_periode(nama, years, months):
+    # Backend SQL: tidak ada frame; fungsi lain memakai periode untuk klausa WHERE
+    if uses_sql():
+        return None
+    return data.filter_periode(nama, years, months)
+
+
+def columns(nama, df):
+    if uses_sql():
+        return _sql().columns(BACKEND, nama)
+    return list(df.columns)
+
+
+def aggregate(nama, df, periode, by, dropna=True, **aggs):
+    # Sama dengan df.groupby(by, as_index=False).agg(**aggs); fungsi: sum, mean, count, size
+    if uses_sql():
+        return _sql().aggregate(BACKEND, nama, periode, by, aggs, dropna=dropna)
+    return df.groupby(by, observed=True, dropna=dropna, as_index=False).agg(**aggs)
+
+
+def count(nama, periode, cari_kolom=None, cari=""):
+    # Khusus backend SQL; backend pandas memakai tabel.positions
+    return _sql().count(BACKEND, nama, periode, cari_kolom, cari)
+
+
+def page(nama, periode, kolom, **opsi):
+    return _sql().page(BACKEND, nama, periode, kolom, **opsi)
@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import data
+
+# ========== Ringkasan Klaim ==========
+# Jumlah klaim dan total nominal per (bulan, status) untuk setiap dataset, disimpan kecil di
+# .cache/ringkasan.json. Dicatat per unit penyimpanan yang sama dengan data.dataset_version
+# (sha256 workbook + nama partisi), jadi ingest cukup menambah satu unit tanpa membaca ulang data lama.
+# Halaman utama hanya membaca file ini, tidak pernah memuat dataset
+RINGKASAN_PATH = data.CACHE_DIR / "ringkasan.json"
+FORMAT_VERSI = 1
+
+_lock = threading.Lock()
+
+
+def _kolom_nominal(nama, kolom):
+    return [col for col in data.SCHEMA[nama]["rupiah"] if col in kolom]
+
+
+def hitung(nama, df):
+    # Satu potongan (sudah lewat parse_dates, jadi ada TAHUN/BULAN) -> frame kecil per (periode, status)
+    nominal = _kolom_nominal(nama, df.columns)
+    g = pd.DataFrame({
+        "periode": df["TAHUN"] * 100 + df["BULAN"] if "TAHUN" in df.columns else np.nan,
+        "status": pd.to_numeric(df["status"], errors="coerce") if "status" in df.columns else np.nan,
+        **{col: pd.to_numeric(df[col], errors="coerce") for col in nominal},
+    }, index=df.index)
+    return g.groupby(["periode", "status"], dropna=False).agg(
+        jumlah=("periode", "size"), **{col: (col, "sum") for col in nominal},
+    ).reset_index()
+
+
+def _angka(v):
+    if pd.isna(v):
+        return None
+    v = float(v)
+    return int(v) if v.is_integer() else v
+
+
+def gabung(frames):
+    # Frame hasil hitung() dari beberapa potongan -> daftar record JSON
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return []
+    df = pd.concat(frames, ignore_index=True)
+    df = df.groupby(["periode", "status"], dropna=False).sum(min_count=1).reset_index()
+    return [{k: _angka(v) for k, v in row.items()} for row in df.to_dict("records")]
+
+
+def _baca():
+    try:
+        with open(RINGKASAN_PATH) as f:
+            isi = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return isi.get("dataset", {}) if isi.get("versi") == FORMAT_VERSI else {}
+
+
+def _tulis(isi):
+    data.CACHE_DIR.mkdir(exist_ok=True)
+    tmp = RINGKASAN_PATH.with_suffix(f".json.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump({"versi": FORMAT_VERSI, "dataset": isi}, f)
+    os.replace(tmp, RINGKASAN_PATH)
+
+
+def simpan(nama, unit, records):
+    # Dipanggil setelah convert (unit = sha256 workbook) atau ingest (unit = nama partisi)
+    with _lock:
+        isi = _baca()
+        isi.setdefault(nama, {})[unit] = records
+        _tulis(isi)
+
+
+def _path_unit(nama, unit):
+    partisi = data.PARTISI_DIR / nama / f"{unit}.parquet"
+    return partisi if partisi.exists() else data.parquet_path(nama)
+
+
+def _hitung_ulang(nama, unit):
+    # Unit tanpa ringkasan (mis. cache dibuat sebelum ringkasan ada): hanya kolom yang dibutuhkan dibaca
+    file = pq.ParquetFile(_path_unit(nama, unit))
+    kolom = [col for col in ["TAHUN", "BULAN", "status"] + _kolom_nominal(nama, file.schema_arrow.names)
+             if col in file.schema_arrow.names]
+    return gabung([hitung(nama, batch.to_pandas()) for batch in file.iter_batches(columns=kolom)])
+
+
+def get(nama):
+    # DataFrame periode/status/jumlah/nominal untuk versi dataset saat ini
+    units = data.dataset_version(nama).split("+")
+    with _lock:
+        isi = _baca()
+        tersimpan = isi.get(nama, {})
+        hilang = [unit for unit in units if unit not in tersimpan]
+        if hilang or set(tersimpan) != set(units):
+            isi[nama] = {unit: tersimpan[unit] if unit in tersimpan else _hitung_ulang(nama, unit) for unit in units}
+            _tulis(isi)
+        records = [r for unit in units for r in isi[nama][unit]]
+
+    kolom = ["periode", "status", "jumlah"] + data.SCHEMA[nama]["rupiah"]
+    df = pd.DataFrame(records, columns=kolom)
+    if df.empty:
+        return df
+    return df.groupby(["periode", "status"], dropna=False).sum(min_count=1).reset_index()
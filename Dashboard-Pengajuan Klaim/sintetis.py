@@ -0,0 +1,217 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import data
+import icd
+
+# ========== Data Sintetis ==========
+# Klaim buatan dengan kolom yang sama dengan ekspor e-Klaim, untuk mengukur dashboard pada
+# ukuran data yang belum kita punya. Non-CBGs dan Obat diambil ulang (bootstrap) dari dataset
+# asli lalu diberi kunci, tanggal dan nominal baru; INA-CBGs dibangun dari tabel grup di bawah.
+CHUNK_ROWS = 500_000
+TAHUN = (2022, 2024)
+
+# (kode INA-CBG, deskripsi, tarif dasar kelas 3, diagnosa utama yang umum)
+GRUP_INACBG = [
+    ("K-4-17", "NYERI ABDOMEN & GASTROENTERITIS LAIN-LAIN", 2_400_000, ["K29.7", "K30", "R10.4", "A09"]),
+    ("J-4-16", "INFEKSI SALURAN NAFAS BAWAH", 3_600_000, ["J18.9", "J15.9", "J20.9"]),
+    ("A-4-13", "DEMAM BERDARAH DENGUE", 2_700_000, ["A91", "A90"]),
+    ("I-4-12", "GAGAL JANTUNG", 4_900_000, ["I50.0", "I50.9", "I11.0"]),
+    ("E-4-10", "DIABETES MELITUS", 3_300_000, ["E11.9", "E11.6", "E10.9"]),
+    ("N-4-10", "GAGAL GINJAL", 3_900_000, ["N18.5", "N18.9", "N17.9"]),
+    ("O-6-10", "PERSALINAN VAGINAL", 2_600_000, ["O80.0", "O80.9"]),
+    ("O-6-12", "OPERASI PEMBEDAHAN CAESAR", 6_100_000, ["O82.1", "O82.0", "O34.2"]),
+    ("G-4-14", "GANGGUAN PEMBULUH DARAH OTAK", 4_400_000, ["I63.9", "I64"]),
+    ("I-4-10", "INFARK MIOKARD AKUT", 5_600_000, ["I21.9", "I21.4"]),
+    ("K-1-14", "PROSEDUR APENDIKS", 7_200_000, ["K35.8", "K35.9", "K37"]),
+    ("C-4-12", "KEMOTERAPI", 2_200_000, ["Z51.1"]),
+]
+# Tingkat keparahan: (akhiran kode, label, pengali tarif, peluang)
+KEPARAHAN = [("I", "RINGAN", 1.0, 0.70), ("II", "SEDANG", 1.5, 0.22), ("III", "BERAT", 2.3, 0.08)]
+PENGALI_KELAS = {1: 1.4, 2: 1.2, 3: 1.0}
+KOMORBID = ["I10", "E11.9", "E78.5", "D64.9", "K21.9", "J45.9", "N39.0", "R50.9"]
+
+
+def _zipf(n, s=1.1):
+    p = 1.0 / np.arange(1, n + 1) ** s
+    return p / p.sum()
+
+
+def _sep(mulai, tanggal):
+    # Format nomor SEP RS BP Batam: 0407R001 + MMYY + V + nomor urut
+    mmyy = tanggal.dt.strftime("%m%y")
+    urut = pd.Series(np.arange(mulai, mulai + len(tanggal)), index=tanggal.index).map("{:06d}".format)
+    return "0407R001" + mmyy + "V" + urut
+
+
+def _tanggal(rng, n, tahun):
+    awal = pd.Timestamp(tahun[0], 1, 1)
+    hari = (pd.Timestamp(tahun[1], 12, 31) - awal).days + 1
+    return pd.Series(awal + pd.to_timedelta(rng.integers(0, hari, n), unit="D"))
+
+
+def _kode(jenis):
+    return np.array(icd.build_index(jenis).codes)
+
+
+def _daftar_kode(rng, pilihan, jumlah):
+    # jumlah[i] kode per baris, digabung dengan ";" seperti DIAGLIST/PROCLIST e-Klaim
+    total = int(jumlah.sum())
+    kode = pilihan[rng.choice(len(pilihan), total, p=_zipf(len(pilihan)))] if total else np.array([], dtype=object)
+    batas = np.cumsum(jumlah)[:-1]
+    return [";".join(bagian) if len(bagian) else np.nan for bagian in np.split(kode, batas)]
+
+
+def generate_ina_cbgs(rows, seed=0, mulai=0, tahun=TAHUN):
+    rng = np.random.default_rng(seed)
+    icd10 = _kode("icd10")
+    ada = set(icd10)
+
+    grup = rng.choice(len(GRUP_INACBG), rows, p=_zipf(len(GRUP_INACBG), s=0.8))
+    tingkat = rng.choice(len(KEPARAHAN), rows, p=[k[3] for k in KEPARAHAN])
+    kelas = rng.choice([1, 2, 3], rows, p=[0.2, 0.3, 0.5])
+    tanggal = _tanggal(rng, rows, tahun)
+
+    kode_grup = np.array([g[0] for g in GRUP_INACBG], dtype=object)
+    deskripsi = np.array([g[1] for g in GRUP_INACBG], dtype=object)
+    dasar = np.array([g[2] for g in GRUP_INACBG], dtype=float)
+    akhiran = np.array([k[0] for k in KEPARAHAN], dtype=object)
+    label = np.array([k[1] for k in KEPARAHAN], dtype=object)
+    pengali = np.array([k[2] for k in KEPARAHAN])
+
+    total_tarif = np.round(dasar[grup] * pengali[tingkat] * pd.Series(kelas).map(PENGALI_KELAS).to_numpy(), -2)
+    tarif_rs = np.round(total_tarif * rng.lognormal(0.05, 0.35, rows), -2)
+
+    # Diagnosa utama dari daftar grup (yang ada di katalog ICD-10), sisanya komorbid/kode acak
+    utama = np.empty(rows, dtype=object)
+    for i, (_, _, _, kode) in enumerate(GRUP_INACBG):
+        kode = [k for k in kode if k in ada] or list(icd10[:1])
+        pilih = grup == i
+        utama[pilih] = rng.choice(kode, int(pilih.sum()))
+    komorbid = np.array([k for k in KOMORBID if k in ada] + list(rng.choice(icd10, 200, replace=False)), dtype=object)
+    sekunder = _daftar_kode(rng, komorbid, rng.poisson(1.2, rows).clip(0, 5))
+    diaglist = [u if isinstance(s, float) else f"{u};{s}" for u, s in zip(utama, sekunder)]
+    icd9 = rng.choice(_kode("icd9"), 300, replace=False)
+    proclist = _daftar_kode(rng, icd9, rng.poisson(1.0, rows).clip(0, 4))
+
+    obstetri = np.isin(kode_grup[grup], ["O-6-10", "O-6-12"])
+    seks = np.where(obstetri, 2, rng.choice([1, 2], rows))
+    umur = np.where(obstetri, rng.integers(18, 45, rows), rng.integers(0, 90, rows))
+
+    # Klaim dengan tarif RS jauh di atas tarif INA-CBG lebih sering ditolak
+    peluang = np.where(tarif_rs > total_tarif * 1.3, 0.72, 0.9)
+    df = pd.DataFrame({
+        "SEP": _sep(mulai, tanggal),
+        "ADMISSION_DATE": tanggal,
+        "SEX": seks,
+        "UMUR_TAHUN": umur,
+        "KELAS_RAWAT": kelas,
+        "PTD": rng.choice([1, 2], rows, p=[0.9, 0.1]),
+        "DIAGLIST": diaglist,
+        "PROCLIST": proclist,
+        "LOS": 1 + rng.poisson(2.5 * pengali[tingkat]),
+        "INACBG": kode_grup[grup] + "-" + akhiran[tingkat],
+        "DESKRIPSI_INACBG": deskripsi[grup] + " " + label[tingkat],
+        "VERSI_INACBG": 5.8,
+        "DISCHARGE_STATUS": rng.choice([1, 2, 3, 4, 5], rows, p=[0.88, 0.05, 0.03, 0.01, 0.03]),
+        "OBAT": np.where(rng.random(rows) < 0.3, np.round(rng.lognormal(12.5, 0.8, rows), -2), 0),
+        "OBAT_KRONIS": np.where(rng.random(rows) < 0.1, np.round(rng.lognormal(12.0, 0.6, rows), -2), 0),
+        "TARIF_RS": tarif_rs,
+        "TOTAL_TARIF": total_tarif,
+        "status": (rng.random(rows) < peluang).astype(int),
+    })
+    return df
+
+
+def _sampel(nama, rows, rng):
+    asli = data.load_df(nama)
+    return asli.iloc[rng.integers(0, len(asli), rows)].reset_index(drop=True)
+
+
+def _skala(rng, rows):
+    # Nominal baris sampel dikalikan faktor acak kecil supaya tidak ada nilai yang persis berulang
+    return rng.lognormal(0.0, 0.1, rows)
+
+
+def generate_non_cbgs(rows, seed=0, mulai=0, tahun=TAHUN):
+    rng = np.random.default_rng(seed)
+    df = _sampel("non_cbgs", rows, rng)
+
+    tanggal = _tanggal(rng, rows, tahun)
+    df["tanggal"] = tanggal + (df["tanggal"] - df["tglmasuk"]).fillna(pd.Timedelta(0))
+    df["tglpulang"] = tanggal + (df["tglpulang"] - df["tglmasuk"])
+    df["tglmasuk"] = tanggal
+    df["nosep"] = _sep(mulai, tanggal).where(df["nosep"].notna())
+
+    # Sebagian diagnosa diganti kode lain dari katalog ICD-10 supaya variasinya sebesar data nyata
+    diagnosa = df["diagnosa"].astype(object)
+    ganti = diagnosa.notna() & (rng.random(rows) < 0.3)
+    diagnosa[ganti] = rng.choice(_kode("icd10"), int(ganti.sum()))
+    df["diagnosa"] = diagnosa
+
+    faktor = _skala(rng, rows)
+    df["tarifrs"] = (df["tarifrs"] * faktor).round(-2)
+    df["tagihan"] = (df["tagihan"] * faktor).round(-2)
+    return df.drop(columns=["BULAN", "TAHUN"], errors="ignore")
+
+
+def generate_obat(rows, seed=0, mulai=0, tahun=TAHUN):
+    rng = np.random.default_rng(seed)
+    df = _sampel("obat", rows, rng)
+
+    df["TGL_RESEP"] = _tanggal(rng, rows, tahun)
+    df["SEP_KUNJUNGAN"] = _sep(mulai, df["TGL_RESEP"])
+
+    faktor = _skala(rng, rows)
+    df["BIAYA_TAGIHAN"] = (df["BIAYA_TAGIHAN"] * faktor).round().astype("int64")
+    df["biayasetuju"] = (df["biayasetuju"] * faktor).round().astype("int64").clip(upper=df["BIAYA_TAGIHAN"])
+    return df.drop(columns=["BULAN", "TAHUN"], errors="ignore")
+
+
+GENERATOR = {
+    "ina_cbgs": generate_ina_cbgs,
+    "non_cbgs": generate_non_cbgs,
+    "obat": generate_obat,
+}
+
+
+def generate(nama, rows, seed=0, mulai=0, tahun=TAHUN):
+    # mulai: nomor urut SEP pertama, supaya potongan yang dibuat terpisah tetap berkunci unik
+    return GENERATOR[nama](rows, seed=seed, mulai=mulai, tahun=tahun)
+
+
+def write(nama, rows, out, seed=0, tahun=TAHUN, chunk_rows=CHUNK_ROWS):
+    # Ditulis per potongan; .csv memakai format tanggal ekspor (bisa langsung di-ingest), selain itu Parquet
+    out = Path(out)
+    tanggal = data.DATASETS[nama]["tanggal"]
+    writer = None
+    try:
+        for i, mulai in enumerate(range(0, rows, chunk_rows)):
+            df = generate(nama, min(chunk_rows, rows - mulai), seed=seed + i, mulai=mulai, tahun=tahun)
+            if out.suffix.lower() == ".csv":
+                df[tanggal] = df[tanggal].dt.strftime(data.FORMAT_TANGGAL)
+                df.to_csv(out, mode="w" if i == 0 else "a", header=i == 0, index=False)
+                continue
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buat data klaim sintetis")
+    parser.add_argument("nama", choices=list(GENERATOR))
+    parser.add_argument("rows", type=int)
+    parser.add_argument("out", type=Path, help="File .csv (format ekspor) atau .parquet")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(write(args.nama, args.rows, args.out, seed=args.seed))
@@ -0,0 +1,186 @@
+import sqlite3
+import threading
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+import data
+
+# ========== Basis Data Tertanam ==========
+# Tabel klaim disalin dari penyimpanan Parquet (data.py) ke satu file; dashboard hanya
+# menerima hasil agregat/halaman kecil. "duckdb" butuh paket duckdb (opsional)
+DB_FILE = {"sqlite": "klaim.sqlite", "duckdb": "klaim.duckdb"}
+BATCH_ROWS = 50_000
+
+FUNGSI = {"sum": "SUM({})", "mean": "AVG({})", "count": "COUNT({})", "size": "COUNT(*)"}
+
+_local = threading.local()
+_sync_lock = threading.Lock()
+_duckdb = {}
+
+
+def _quote(col):
+    return '"' + str(col).replace('"', '""') + '"'
+
+
+def connect(engine):
+    # sqlite3: satu koneksi per thread; duckdb: satu database, cursor per thread
+    con = getattr(_local, engine, None)
+    if con is not None:
+        return con
+
+    path = data.CACHE_DIR / DB_FILE[engine]
+    data.CACHE_DIR.mkdir(exist_ok=True)
+    if engine == "sqlite":
+        con = sqlite3.connect(path, timeout=30)
+    else:
+        import duckdb
+
+        with _sync_lock:
+            if "db" not in _duckdb:
+                _duckdb["db"] = duckdb.connect(str(path))
+        con = _duckdb["db"].cursor()
+    setattr(_local, engine, con)
+    return con
+
+
+def _fetch(engine, query, params=()):
+    cur = connect(engine).execute(query, list(params))
+    return pd.DataFrame(cur.fetchall(), columns=[d[0] for d in cur.description])
+
+
+def _insert(engine, nama, df):
+    # category disimpan sebagai teks biasa; nilai kosong tetap NULL (bukan "nan")
+    df = df.assign(**{
+        col: df[col].astype(object).where(df[col].notna(), None)
+        for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)
+    })
+    con = connect(engine)
+    if engine == "sqlite":
+        df.to_sql(nama, con, if_exists="append", index=False)
+        con.commit()
+    else:
+        con.register("_baru", df)
+        try:
+            if not _exists(engine, nama):
+                con.execute(f"CREATE TABLE {_quote(nama)} AS SELECT * FROM _baru")
+            else:
+                con.execute(f"INSERT INTO {_quote(nama)} BY NAME SELECT * FROM _baru")
+        finally:
+            con.unregister("_baru")
+
+
+def _exists(engine, nama):
+    if engine == "sqlite":
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+    else:
+        query = "SELECT 1 FROM information_schema.tables WHERE table_name = ?"
+    return connect(engine).execute(query, [nama]).fetchone() is not None
+
+
+def _stored_version(engine, nama):
+    con = connect(engine)
+    con.execute("CREATE TABLE IF NOT EXISTS _versi (nama TEXT PRIMARY KEY, versi TEXT)")
+    row = con.execute("SELECT versi FROM _versi WHERE nama = ?", [nama]).fetchone()
+    return row[0] if row else None
+
+
+def _batches(path):
+    # Dibaca per batch supaya memori puncak tidak bergantung pada panjang riwayat
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=BATCH_ROWS):
+        yield batch.to_pandas()
+
+
+def sync(engine, nama):
+    # Samakan tabel dengan versi dataset; partisi ingest baru cukup ditambahkan
+    versi = data.dataset_version(nama)
+    with _sync_lock:
+        lama = _stored_version(engine, nama)
+        if lama == versi:
+            return versi
+
+        stems = data._new_parts(lama, versi) if lama is not None else None
+        con = connect(engine)
+        if stems is not None:
+            paths = [data.PARTISI_DIR / nama / f"{stem}.parquet" for stem in stems]
+        else:
+            con.execute(f"DROP TABLE IF EXISTS {_quote(nama)}")
+            paths = [data.convert(nama)] + data.partition_paths(nama)
+
+        for path in paths:
+            for df in _batches(path):
+                _insert(engine, nama, data._prepare(nama, df))
+        con.execute(f"CREATE INDEX IF NOT EXISTS {_quote(f'ix_{nama}_periode')} ON {_quote(nama)} (TAHUN, BULAN)")
+        con.execute("DELETE FROM _versi WHERE nama = ?", [nama])
+        con.execute("INSERT INTO _versi VALUES (?, ?)", [nama, versi])
+        if engine == "sqlite":
+            con.commit()
+    return versi
+
+
+def columns(engine, nama):
+    sync(engine, nama)
+    cur = connect(engine).execute(f"SELECT * FROM {_quote(nama)} LIMIT 0")
+    return [d[0] for d in cur.description]
+
+
+def _check(engine, nama, kolom):
+    ada = set(columns(engine, nama))
+    salah = [col for col in kolom if col not in ada]
+    if salah:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(salah)}")
+
+
+def _where(periode, cari_kolom=None, cari=""):
+    kondisi, params = [], []
+    if periode is not None:
+        for col, nilai in (("TAHUN", periode["years"]), ("BULAN", periode["months"])):
+            nilai = [int(v) for v in nilai]
+            if not nilai:
+                return "WHERE 1 = 0", []
+            kondisi.append(f"{col} IN ({', '.join('?' * len(nilai))})")
+            params.extend(nilai)
+    if cari_kolom and cari:
+        pola = cari.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        kondisi.append(f"LOWER(CAST({_quote(cari_kolom)} AS TEXT)) LIKE ? ESCAPE '\\'")
+        params.append(f"%{pola}%")
+    return ("WHERE " + " AND ".join(kondisi) if kondisi else ""), params
+
+
+def years(engine, nama):
+    sync(engine, nama)
+    df = _fetch(engine, f"SELECT DISTINCT TAHUN FROM {_quote(nama)} WHERE TAHUN IS NOT NULL ORDER BY TAHUN DESC")
+    return [int(tahun) for tahun in df["TAHUN"]]
+
+
+def aggregate(engine, nama, periode, by, aggs, dropna=True):
+    # aggs: {kolom_hasil: (kolom, "sum" | "mean" | "count" | "size")}, seperti named aggregation pandas
+    _check(engine, nama, list(by) + [col for col, fungsi in aggs.values() if fungsi != "size"])
+    where, params = _where(periode)
+    if dropna and by:
+        where += (" AND " if where else "WHERE ") + " AND ".join(f"{_quote(col)} IS NOT NULL" for col in by)
+
+    pilih = [_quote(col) for col in by]
+    pilih += [f"{FUNGSI[fungsi].format(_quote(col))} AS {_quote(nama_hasil)}" for nama_hasil, (col, fungsi) in aggs.items()]
+    query = f"SELECT {', '.join(pilih)} FROM {_quote(nama)} {where}"
+    if by:
+        grup = ", ".join(_quote(col) for col in by)
+        query += f" GROUP BY {grup} ORDER BY {grup}"
+    return _fetch(engine, query, params)
+
+
+def count(engine, nama, periode, cari_kolom=None, cari=""):
+    if cari_kolom:
+        _check(engine, nama, [cari_kolom])
+    where, params = _where(periode, cari_kolom, cari)
+    return int(_fetch(engine, f"SELECT COUNT(*) AS n FROM {_quote(nama)} {where}", params)["n"].iloc[0])
+
+
+def page(engine, nama, periode, kolom, urut=None, ascending=True, cari_kolom=None, cari="", limit=50, offset=0):
+    _check(engine, nama, list(kolom) + [col for col in (urut, cari_kolom) if col])
+    where, params = _where(periode, cari_kolom, cari)
+    query = f"SELECT {', '.join(_quote(col) for col in kolom)} FROM {_quote(nama)} {where}"
+    if urut:
+        query += f" ORDER BY {_quote(urut)} {'ASC' if ascending else 'DESC'} NULLS LAST"
+    query += " LIMIT ? OFFSET ?"
+    return _fetch(engine, query, params + [int(limit), int(offset)])
@@ -0,0 +1,212 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import data
+import ringkasan
+
+# ========== Pembacaan Bertahap ==========
+# Ekspor dibaca per potongan baris (xlsx: openpyxl read_only, csv: chunksize, parquet: batch), jadi memori puncak
+# sebanding dengan CHUNK_ROWS, bukan dengan ukuran file
+CHUNK_ROWS = 50_000
+# Kolom turunan tanggal klaim yang ikut disimpan di Parquet
+TURUNAN = ["BULAN", "TAHUN"]
+
+TIPE_ARROW = {
+    "str": pa.string(),
+    "datetime64[ns]": pa.timestamp("ns"),
+    "int8": pa.int8(), "int16": pa.int16(), "int32": pa.int32(), "int64": pa.int64(),
+    "float64": pa.float64(),
+}
+
+
+def _header(row):
+    return [f"Unnamed: {i}" if nilai is None else nilai for i, nilai in enumerate(row)]
+
+
+def iter_chunks(path, chunk_rows=CHUNK_ROWS):
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+        return
+    if path.suffix.lower() == ".parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+        return
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = _header(next(rows, ()))
+        n = len(header)
+        batch = []
+        for row in rows:
+            if all(nilai is None for nilai in row):
+                continue
+            batch.append(tuple(row[:n]) + (None,) * (n - len(row)))
+            if len(batch) == chunk_rows:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        wb.close()
+
+
+def parse_dates(nama, df, errors="raise"):
+    # Tanggal klaim (TGL_RESEP, ADMISSION_DATE, tglmasuk) dan BULAN/TAHUN dihitung per potongan
+    kolom = data.DATASETS[nama]["tanggal"]
+    if kolom in df.columns:
+        df[kolom] = pd.to_datetime(df[kolom], format=data.FORMAT_TANGGAL, errors=errors)
+        df["BULAN"] = df[kolom].dt.month
+        df["TAHUN"] = df[kolom].dt.year
+    return df
+
+
+# ========== Skema Gabungan ==========
+def _jenis(s):
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return "tanggal"
+    if pd.api.types.is_numeric_dtype(s):
+        return "angka"
+    jenis = pd.api.types.infer_dtype(s, skipna=True)
+    if jenis == "empty":
+        return "kosong"
+    return "tanggal" if jenis in ("date", "datetime") else "teks"
+
+
+def _catat(nama, statistik, df, rows):
+    # Ringkasan per kolom yang cukup untuk memilih tipe akhir tanpa menyimpan datanya
+    cfg = data.DATASETS[nama]
+    kategori = data.SCHEMA[nama]["kategori"]
+    for col in df.columns:
+        s = df[col]
+        st = statistik.setdefault(col, {
+            "jenis": set(), "kosong": False, "pecahan": False, "int": True,
+            "min": None, "max": None, "unik": set() if col in kategori else None,
+        })
+        jenis = "teks" if col in cfg["teks"] else _jenis(s)
+        st["jenis"].add(jenis)
+        st["kosong"] |= bool(s.isna().any())
+        if jenis == "angka":
+            nilai = s.dropna()
+            st["int"] &= pd.api.types.is_integer_dtype(s)
+            if len(nilai):
+                st["pecahan"] |= bool((nilai % 1 != 0).any())
+                st["min"] = nilai.min() if st["min"] is None else min(st["min"], nilai.min())
+                st["max"] = nilai.max() if st["max"] is None else max(st["max"], nilai.max())
+        if st["unik"] is not None:
+            st["unik"].update((s.astype(str) if col in cfg["teks"] else s.dropna()).unique().tolist())
+            # Sudah terlalu banyak nilai unik untuk category; berhenti mencatat
+            if len(st["unik"]) > rows * data.RASIO_KATEGORI:
+                st["unik"] = None
+
+
+def _tipe(nama, col, st, rows):
+    # Aturan yang sama dengan pemadatan skema memori: (tipe dasar, category?)
+    skema = data.SCHEMA[nama]
+    kategori = st["unik"] is not None and len(st["unik"]) <= rows * data.RASIO_KATEGORI
+    jenis = st["jenis"] - {"kosong"}
+    if col in data.DATASETS[nama]["teks"] or "teks" in jenis or len(jenis) > 1:
+        return "str", kategori
+    if jenis == {"tanggal"}:
+        return "datetime64[ns]", kategori
+    if not jenis:
+        return "float64", kategori
+
+    bulat = not st["kosong"] and not st["pecahan"]
+    if col in skema["bilangan"] and bulat:
+        for tipe in ("int8", "int16", "int32"):
+            if np.iinfo(tipe).min <= st["min"] and st["max"] <= np.iinfo(tipe).max:
+                return tipe, kategori
+        return "int64", kategori
+    if bulat and (st["int"] or col in skema["rupiah"]):
+        return "int64", kategori
+    return "float64", kategori
+
+
+def _teks(s, semua=False):
+    # Seperti astype(str), tetapi nilai kosong tetap kosong dan 12.0 (dari kolom float) menjadi "12"
+    if semua:
+        return s.astype(str)
+    hasil = s.astype(object)
+    ada = hasil.notna()
+    hasil[ada] = hasil[ada].map(lambda v: str(int(v)) if isinstance(v, float) and v.is_integer() else str(v))
+    return hasil
+
+
+def _terapkan(nama, df, tipe):
+    teks = data.DATASETS[nama]["teks"]
+    for col, (dasar, kategori) in tipe.items():
+        if col not in df.columns:
+            df[col] = None
+        if dasar == "str":
+            df[col] = _teks(df[col], semua=col in teks)
+        elif dasar == "datetime64[ns]":
+            df[col] = pd.to_datetime(df[col])
+        else:
+            df[col] = df[col].astype(dasar)
+        if kategori:
+            df[col] = df[col].astype("category")
+    return df[list(tipe)]
+
+
+def _schema(tipe):
+    return pa.schema([
+        (col, pa.dictionary(pa.int32(), TIPE_ARROW[dasar]) if kategori else TIPE_ARROW[dasar])
+        for col, (dasar, kategori) in tipe.items()
+    ])
+
+
+# ========== Penulisan ==========
+def write(nama, path, out, ubah=None, errors="raise", chunk_rows=CHUNK_ROWS):
+    # Dua tahap: potongan mentah disimpan sementara sambil dicatat statistiknya, lalu ditulis
+    # ulang ke satu file Parquet dengan skema gabungan. ubah(df) opsional untuk validasi/saring.
+    folder = Path(tempfile.mkdtemp(prefix=f"{nama}.", dir=Path(out).parent))
+    try:
+        statistik, rows, periode, potongan, per_bulan = {}, 0, set(), [], []
+        for i, df in enumerate(iter_chunks(path, chunk_rows)):
+            df = parse_dates(nama, data._normalize_columns(df), errors=errors)
+            if ubah is not None:
+                df = ubah(df)
+            if df.empty:
+                continue
+            rows += len(df)
+            _catat(nama, statistik, df, rows)
+            if "TAHUN" in df.columns:
+                kunci = (df["TAHUN"] * 100 + df["BULAN"]).dropna()
+                periode.update(int(p) for p in kunci.unique())
+            per_bulan.append(ringkasan.hitung(nama, df))
+            file = folder / f"{i:06d}.parquet"
+            df.to_parquet(file, index=False)
+            potongan.append(file)
+            del df
+
+        if not rows:
+            return {"rows": 0, "memori": {}, "periode": [], "ringkasan": []}
+
+        tipe = {col: _tipe(nama, col, st, rows) for col, st in statistik.items()}
+        schema = _schema(tipe)
+        sebelum = dict.fromkeys(tipe, 0)
+        sesudah = dict.fromkeys(tipe, 0)
+        with pq.ParquetWriter(out, schema) as writer:
+            for file in potongan:
+                df = pq.read_table(file).to_pandas()
+                for col, nbytes in df.memory_usage(deep=True, index=False).items():
+                    sebelum[col] += int(nbytes)
+                df = _terapkan(nama, df, tipe)
+                for col, nbytes in df.memory_usage(deep=True, index=False).items():
+                    sesudah[col] += int(nbytes)
+                writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    memori = {col: [sebelum[col], sesudah[col]] for col in tipe if sebelum[col] != sesudah[col]}
+    return {"rows": rows, "memori": memori, "periode": sorted(periode), "ringkasan": ringkasan.gabung(per_bulan)}
@@ -0,0 +1,122 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import data
+import query
+
+UKURAN_HALAMAN = (25, 50, 100, 200)
+TANPA_URUTAN = "(Tanpa urutan)"
+
+# Urutan/hasil cari disimpan per (versi dataset, filter periode, kolom, ...); dibatasi supaya memori tetap kecil
+MAKS_CACHE = 32
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached(key, hitung):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    hasil = hitung()
+    with _cache_lock:
+        _cache[key] = hasil
+        while len(_cache) > MAKS_CACHE:
+            _cache.popitem(last=False)
+    return hasil
+
+
+def _base_key(nama, periode):
+    return (nama, data.dataset_version(nama), tuple(sorted(periode["years"])), tuple(sorted(periode["months"])))
+
+
+def sort_order(s, ascending=True):
+    # Posisi baris (0..n-1) setelah sort. Category tanpa urutan diurutkan lewat peringkat nilai kategorinya
+    # (bukan urutan kode: setelah ingest, kategori baru ditambahkan di akhir), tanpa perbandingan teks per baris
+    s = s.reset_index(drop=True)
+    if isinstance(s.dtype, pd.CategoricalDtype) and not s.cat.ordered:
+        peringkat = np.empty(len(s.cat.categories) + 1)
+        peringkat[s.cat.categories.argsort()] = np.arange(len(s.cat.categories))
+        peringkat[-1] = np.nan
+        s = pd.Series(peringkat[s.cat.codes.to_numpy()])
+    return s.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+
+
+def search_mask(s, teks):
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # Cukup cocokkan daftar kategori (puluhan nilai), lalu pilih baris lewat kodenya
+        cocok = s.cat.categories.astype(str).str.contains(teks, case=False, regex=False)
+        return np.isin(s.cat.codes.to_numpy(), np.flatnonzero(cocok))
+    return s.astype(str).str.contains(teks, case=False, regex=False).to_numpy()
+
+
+def positions(nama, df, periode, urut=None, ascending=True, cari_kolom=None, cari=""):
+    base = _base_key(nama, periode)
+    if urut:
+        posisi = _cached(base + ("urut", urut, ascending), lambda: sort_order(df[urut], ascending))
+    else:
+        posisi = np.arange(len(df))
+
+    if cari_kolom and cari:
+        mask = _cached(base + ("cari", cari_kolom, cari), lambda: search_mask(df[cari_kolom], cari))
+        posisi = posisi[mask[posisi]]
+    return posisi
+
+
+def page(df, posisi, kolom, halaman, ukuran):
+    # Hanya baris di halaman aktif yang diambil (dan dikirim ke browser)
+    mulai = (halaman - 1) * ukuran
+    return df[kolom].iloc[posisi[mulai:mulai + ukuran]]
+
+
+def tampilkan(nama, df, periode, default, key):
+    # df None berarti backend SQL: hitung, urut, cari dan ambil halaman lewat query ke basis data
+    semua_kolom = query.columns(nama, df)
+    kolom = st.multiselect('Filter: ', semua_kolom, default=[col for col in default if col in semua_kolom], key=key)
+    if not kolom:
+        st.info("Pilih minimal satu kolom untuk ditampilkan.")
+        return
+
+    col_urut, col_arah, col_cari_kolom, col_cari, col_ukuran = st.columns([2, 1, 2, 2, 1])
+    with col_urut:
+        urut = st.selectbox("Urutkan", [TANPA_URUTAN] + kolom, key=f"{key}_urut")
+    with col_arah:
+        arah = st.selectbox("Arah", ["Naik", "Turun"], key=f"{key}_arah")
+    with col_cari_kolom:
+        cari_kolom = st.selectbox("Cari di kolom", kolom, key=f"{key}_cari_kolom")
+    with col_cari:
+        cari = st.text_input("Cari", key=f"{key}_cari").strip()
+    with col_ukuran:
+        ukuran = st.selectbox("Baris", UKURAN_HALAMAN, index=1, key=f"{key}_ukuran")
+
+    urut = None if urut == TANPA_URUTAN else urut
+    ascending = arah == "Naik"
+    if query.uses_sql():
+        total = query.count(nama, periode, cari_kolom, cari)
+    else:
+        posisi = positions(nama, df, periode, urut=urut, ascending=ascending, cari_kolom=cari_kolom, cari=cari)
+        total = len(posisi)
+
+    jumlah_halaman = max(1, math.ceil(total / ukuran))
+    key_halaman = f"{key}_halaman"
+    if st.session_state.get(key_halaman, 1) > jumlah_halaman:
+        st.session_state[key_halaman] = jumlah_halaman
+    halaman = st.number_input("Halaman", min_value=1, max_value=jumlah_halaman, step=1, key=key_halaman)
+
+    mulai = (halaman - 1) * ukuran
+    if query.uses_sql():
+        hasil = query.page(nama, periode, kolom, urut=urut, ascending=ascending,
+                           cari_kolom=cari_kolom, cari=cari, limit=ukuran, offset=mulai)
+    else:
+        hasil = page(df, posisi, kolom, halaman, ukuran)
+
+    st.dataframe(hasil, use_container_width=True)
+    st.caption(
+        f"Baris {min(mulai + 1, total):,}–{min(mulai + ukuran, total):,} dari {total:,} "
+        f"(halaman {halaman} dari {jumlah_halaman})"
+    )
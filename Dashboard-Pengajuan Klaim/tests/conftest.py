@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Modul aplikasi diimpor langsung (import data, import models, ...) seperti saat streamlit run
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
@@ -0,0 +1,20 @@
+import pandas as pd
+
+import batch
+from conftest import APP_DIR
+
+
+def test_score_frame_noncbgs_melewati_baris_tidak_lengkap():
+    df = pd.read_excel(APP_DIR / "pengajuan_noncbgs_dengan_status.xlsx")
+    hasil = batch.score_frame("non_cbgs", df)
+
+    assert len(hasil) == len(df)
+    dilewati = hasil["prediction_score"].isna()
+    assert dilewati.sum() == 224
+    assert hasil.loc[dilewati, "prediction_label"].isna().all()
+    assert hasil.loc[dilewati, "prediction_skip_reason"].str.contains("jnspelayanan").all()
+
+    diprediksi = hasil[~dilewati]
+    assert diprediksi["prediction_score"].between(0, 1).all()
+    assert diprediksi["prediction_label"].isin([0, 1]).all()
+    assert diprediksi["prediction_skip_reason"].isna().all()
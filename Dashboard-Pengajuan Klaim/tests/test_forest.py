@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+import forest
+
+
+@pytest.fixture(scope="module")
+def data_sintetis():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(400, 6)), columns=[f"f{i}" for i in range(6)])
+    y = ((X["f0"] + X["f1"] * X["f2"] + rng.normal(scale=0.5, size=len(X))) > 0).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize("n", [1, 20, forest.BATAS_BARIS, forest.BATAS_BARIS + 1, 100])
+def test_pipeline_sama_dengan_predict_proba(data_sintetis, n):
+    X, y = data_sintetis
+    pipe = Pipeline([
+        ("scaler", StandardScaler()),
+        ("rf", RandomForestClassifier(n_estimators=25, random_state=0)),
+    ]).fit(X, y)
+    flat = forest.FlatPipeline(pipe)
+    assert np.allclose(flat.predict_proba(X.head(n)), pipe.predict_proba(X.head(n)))
+    # Evaluator datar langsung (tanpa jatuh ke sklearn di atas BATAS_BARIS)
+    assert np.allclose(flat.forest.predict_proba(flat.transform(X.head(n))), pipe.predict_proba(X.head(n)))
+
+
+def test_forest_tanpa_pipeline_urutan_kolom(data_sintetis):
+    X, y = data_sintetis
+    et = ExtraTreesClassifier(n_estimators=10, random_state=0).fit(X, y)
+    flat = forest.flatten(et)
+    acak = X.head(10)[X.columns[::-1]]
+    assert np.allclose(flat.predict_proba(acak), et.predict_proba(X.head(10)))
+
+
+def test_pohon_hanya_daun(data_sintetis):
+    # min_samples_split lebih besar dari jumlah baris: setiap pohon hanya berisi akar (kedalaman 0)
+    X, y = data_sintetis
+    rf = RandomForestClassifier(n_estimators=5, min_samples_split=len(X) + 1, random_state=0).fit(X, y)
+    flat = forest.flatten(rf)
+    assert flat.forest.kedalaman == 0
+    assert np.allclose(flat.predict_proba(X.head(10)), rf.predict_proba(X.head(10)))
+
+
+def test_save_load(data_sintetis, tmp_path):
+    X, y = data_sintetis
+    rf = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    flat = forest.FlatForest.from_estimator(rf)
+    flat.save(tmp_path / "rf.npz")
+    dimuat = forest.FlatForest.load(tmp_path / "rf.npz")
+    Z = X.head(10).to_numpy()
+    assert np.array_equal(dimuat.predict_proba(Z), flat.predict_proba(Z))
@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+import cube
+import data
+import ingest
+import ringkasan
+
+
+def _baris(sep, tanggal, obat="Trastuzumab 440 SK vial 20 ml", jenis="Obat Kemoterapi", biaya=6208000, status=1):
+    return {
+        "SEP_KUNJUNGAN": sep, "jenisresep": jenis, "nokartu": 1617219786, "noresep": f"R{sep[-3:]}",
+        "TGL_RESEP": tanggal, "obat": obat, "jmlobat": 1, "BIAYA_TAGIHAN": biaya, "jmlobatsetuju": 1,
+        "biayasetuju": biaya if status else 0, "ket_verfikasi": "sesuai", "no_fpk": "0407A008240431",
+        "nama_file": "rptFPKLamp - Obat", "status": status,
+    }
+
+
+@pytest.fixture
+def folder_data(tmp_path, monkeypatch):
+    # Workbook dasar dan semua cache diarahkan ke tmp_path
+    monkeypatch.setattr(data, "BASE_DIR", tmp_path)
+    monkeypatch.setattr(data, "CACHE_DIR", tmp_path / ".cache")
+    monkeypatch.setattr(data, "PARTISI_DIR", tmp_path / "partisi")
+    monkeypatch.setattr(ringkasan, "RINGKASAN_PATH", tmp_path / ".cache" / "ringkasan.json")
+    monkeypatch.setattr(data, "_datasets", {})
+    monkeypatch.setattr(cube, "_cubes", {})
+
+    lama = pd.DataFrame([
+        _baris("0407R0010424V001", pd.Timestamp(2024, 4, 4)),
+        _baris("0407R0010424V002", pd.Timestamp(2024, 4, 10), jenis="Obat Kronis", biaya=150000),
+        _baris("0407R0010424V003", pd.Timestamp(2024, 4, 22), status=0),
+        _baris("0407R0010424V004", pd.Timestamp(2024, 4, 29), obat="Paclitaxel 100 mg"),
+    ])
+    lama.to_excel(tmp_path / data.DATASETS["obat"]["file"], index=False)
+    return tmp_path
+
+
+def _ekspor(path, rows):
+    df = pd.DataFrame(rows)
+    df["TGL_RESEP"] = df["TGL_RESEP"].dt.strftime(data.FORMAT_TANGGAL)
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_ingest_membuang_duplikat_dan_menambah_delta(folder_data):
+    versi_lama = data.dataset_version("obat")
+    df_lama = data.get_dataset("obat")
+    values = cube.CUBES["obat"]["values"]
+
+    ekspor = _ekspor(folder_data / "mei.csv", [
+        # Kiriman ulang dari riwayat April
+        _baris("0407R0010424V001", pd.Timestamp(2024, 4, 4)),
+        _baris("0407R0010424V003", pd.Timestamp(2024, 4, 22), status=0),
+        # Baris baru; satu muncul dua kali di file yang sama
+        _baris("0407R0010524V005", pd.Timestamp(2024, 5, 2)),
+        _baris("0407R0010524V006", pd.Timestamp(2024, 5, 15), jenis="Obat Kronis", biaya=150000),
+        _baris("0407R0010524V006", pd.Timestamp(2024, 5, 15), jenis="Obat Kronis", biaya=150000),
+        # Obat lain pada SEP/resep yang sudah ada tetap baris baru
+        _baris("0407R0010424V004", pd.Timestamp(2024, 4, 29), obat="Ondansetron 8 mg", biaya=45000),
+    ])
+    hasil = ingest.ingest("obat", ekspor)
+    assert hasil["status"] == "ok"
+    assert (hasil["read"], hasil["rows"], hasil["duplikat"]) == (6, 3, 3)
+    assert hasil["periode"] == [202404, 202405]
+
+    assert ingest.ingest("obat", ekspor)["status"] == "sudah pernah di-ingest"
+
+    delta = data.get_delta("obat", versi_lama)
+    assert len(delta) == 3
+    assert len(data.get_dataset("obat")) == len(df_lama) + 3
+
+    for dim in [None, "jenisresep"]:
+        gabungan = cube.merge_cube(cube.build_cube(df_lama, dim, values), delta, dim, values)
+        penuh = cube.build_cube(data.get_dataset("obat"), dim, values)
+        # Kolom dimensi category menjadi object setelah concat di merge_cube; yang dibandingkan isinya
+        pd.testing.assert_frame_equal(gabungan, penuh, check_dtype=False, check_categorical=False)
+
+
+def test_ingest_hanya_duplikat(folder_data):
+    ekspor = _ekspor(folder_data / "ulang.csv", [_baris("0407R0010424V002", pd.Timestamp(2024, 4, 10), jenis="Obat Kronis", biaya=150000)])
+    hasil = ingest.ingest("obat", ekspor)
+    assert hasil["status"] == "semua baris duplikat"
+    assert data.partition_paths("obat") == []
@@ -0,0 +1,184 @@
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+_KEY = "_timing_stages"
+_PROFILER_KEY = "_timing_profiler"
+
+# ========== Log Terstruktur ==========
+# Satu baris JSON per tahap: waktu, baris masuk/keluar, selisih memori (RSS). Dirotasi per ukuran file
+LOG_DIR = Path(__file__).resolve().parent / "logs"
+LOG_FILE = LOG_DIR / "timing.jsonl"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+
+_logger = logging.getLogger("klaim.timing")
+_logger_lock = threading.Lock()
+# Tumpukan tahap per thread; hanya tahap teratas yang masuk panel waktu proses
+_local = threading.local()
+
+
+def _log():
+    with _logger_lock:
+        if not _logger.handlers:
+            LOG_DIR.mkdir(exist_ok=True)
+            handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _logger.addHandler(handler)
+            _logger.setLevel(logging.INFO)
+            _logger.propagate = False
+    return _logger
+
+
+def _rss():
+    # Memori resident proses saat ini; None di luar Linux (tanpa /proc)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def rows(obj):
+    # Jumlah baris DataFrame (atau elemen pertama tuple hasil seperti (df_filtered, periode))
+    if isinstance(obj, tuple) and obj:
+        obj = obj[0]
+    return len(obj) if isinstance(obj, (pd.DataFrame, pd.Series)) else None
+
+
+def start(halaman="main"):
+    # Dipanggil di awal setiap rerun halaman, supaya panel hanya menampilkan rerun terakhir
+    # Rerun sebelumnya yang berhenti sebelum panel() (st.stop(), rerun, exception) masih meninggalkan
+    # profiler aktif di sesi ini: dihentikan dan disimpan ke logs/ tanpa ditampilkan
+    _stop_profiler(tampil=False)
+    st.session_state[_KEY] = []
+    _local.halaman = halaman
+    _start_profiler()
+
+
+@contextmanager
+def stage(nama, rows_in=None):
+    # info["rows_out"] boleh diisi di dalam blok; tahap bersarang dicatat dengan parent-nya
+    stack = _local.__dict__.setdefault("stack", [])
+    info = {"rows_in": rows_in, "rows_out": None}
+    parent = stack[-1] if stack else None
+    stack.append(nama)
+    rss = _rss()
+    mulai = time.perf_counter()
+    error = None
+    try:
+        yield info
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        durasi = time.perf_counter() - mulai
+        stack.pop()
+        if parent is None and get_script_run_ctx() is not None:
+            st.session_state.setdefault(_KEY, []).append((nama, durasi))
+        akhir = _rss()
+        _log().info(json.dumps({
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "page": getattr(_local, "halaman", None),
+            "stage": nama,
+            "parent": parent,
+            "wall_s": round(durasi, 6),
+            "rows_in": info["rows_in"],
+            "rows_out": info["rows_out"],
+            "mem_delta_bytes": akhir - rss if akhir is not None and rss is not None else None,
+            "rss_bytes": akhir,
+            "pid": os.getpid(),
+            "error": error,
+        }))
+
+
+def instrument(nama=None):
+    # Dekorator: rows_in dari argumen DataFrame pertama, rows_out dari nilai kembali
+    def bungkus(fungsi):
+        @functools.wraps(fungsi)
+        def jalan(*args, **kwargs):
+            masuk = next((rows(a) for a in list(args) + list(kwargs.values()) if rows(a) is not None), None)
+            with stage(nama or fungsi.__name__, rows_in=masuk) as info:
+                hasil = fungsi(*args, **kwargs)
+                info["rows_out"] = rows(hasil)
+            return hasil
+        return jalan
+    return bungkus
+
+
+# ========== Profiling ==========
+# ?profile=1 (cProfile) atau ?profile=pyinstrument pada URL halaman; hasil tampil di sidebar
+# dan disimpan di logs/
+def _start_profiler():
+    mode = st.experimental_get_query_params().get("profile", [None])[0]
+    st.session_state[_PROFILER_KEY] = None
+    if not mode:
+        return
+
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+
+            profiler = Profiler()
+            profiler.start()
+            st.session_state[_PROFILER_KEY] = ("pyinstrument", profiler)
+            return
+        except ImportError:
+            st.sidebar.warning("pyinstrument tidak terpasang, memakai cProfile")
+    profiler = cProfile.Profile()
+    profiler.enable()
+    st.session_state[_PROFILER_KEY] = ("cprofile", profiler)
+
+
+def _stop_profiler(tampil=True):
+    entry = st.session_state.get(_PROFILER_KEY)
+    if entry is None:
+        return
+    st.session_state[_PROFILER_KEY] = None
+    mode, profiler = entry
+
+    LOG_DIR.mkdir(exist_ok=True)
+    nama = f"profile-{getattr(_local, 'halaman', 'main')}-{datetime.now():%Y%m%d-%H%M%S}"
+    if mode == "pyinstrument":
+        profiler.stop()
+        teks = profiler.output_text(unicode=False, color=False)
+        (LOG_DIR / f"{nama}.html").write_text(profiler.output_html(), encoding="utf-8")
+    else:
+        profiler.disable()
+        buf = io.StringIO()
+        pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(40)
+        teks = buf.getvalue()
+        profiler.dump_stats(LOG_DIR / f"{nama}.prof")
+
+    if not tampil:
+        return
+    with st.sidebar.expander(f"🔬 Profil ({mode})"):
+        st.text(teks)
+        st.caption(f"Disimpan di logs/{nama}")
+
+
+def panel():
+    _stop_profiler()
+    if not st.sidebar.checkbox("Tampilkan Waktu Proses", key="show_timing"):
+        return
+
+    stages = st.session_state.get(_KEY, [])
+    df_timing = pd.DataFrame(stages, columns=["Tahap", "Detik"])
+    df_timing["Detik"] = df_timing["Detik"].round(3)
+    st.sidebar.markdown("## ⏱️ Waktu Proses")
+    st.sidebar.dataframe(df_timing, use_container_width=True)
+    st.sidebar.markdown(f"**Total:** {df_timing['Detik'].sum():.3f} detik")